@@ -1,3 +1,4 @@
+import json
 import boto3
 
 bedrock_runtime = boto3.client(
@@ -8,7 +9,7 @@ bedrock_runtime = boto3.client(
 
 bedrock_runtime.invoke_model(
                 modelId="amazon.nova-canvas-v1:0",
-                body={
+                body=json.dumps({
                     "taskType": "TEXT_IMAGE",
                     "textToImageParams": {
                         "text": "whimsical and ethereal soft-shaded story illustration: A woman in a large hat stands at the ship's railing looking out across the ocean",  # A description of the image you want
@@ -22,7 +23,7 @@ bedrock_runtime.invoke_model(
                         "cfgScale": 7.0,  # How closely the prompt will be followed
                         "seed": 858,  # Use a random seed
                     },
-                },
+                }),
                 accept="application/json",
                 contentType="application/json",
             )
\ No newline at end of file
@@ -0,0 +1,377 @@
+"""
+A local stand-in for the Bedrock runtime, for load and performance tests of the example runner
+
+It serves Converse, ConverseStream and InvokeModel with configurable latency, token
+rate and throttling, and answers judge prompts with a verdict. Start it with
+
+    python fake_bedrock.py --port 8765
+
+(or "python test_examples.py fake-bedrock") and point the runner at it with
+--endpoint-url http://127.0.0.1:8765.
+"""
+import argparse
+import base64
+import fnmatch
+import http.server
+import json
+import logging
+import math
+import random
+import re
+import signal
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+import zlib
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger('fake_bedrock')
+
+FAKE_BEDROCK_PORT = 8765
+FAKE_OUTPUT_TOKENS = 200  # Length of generated replies, in words; each word counts as one token
+FAKE_FILLER_WORDS = ('the', 'model', 'returns', 'a', 'canned', 'reply', 'of', 'plausible', 'length', 'for', 'load', 'testing')
+# Smallest valid PNG (1x1, grey), returned for Nova Canvas requests
+FAKE_PNG = base64.b64encode(
+    b'\x89PNG\r\n\x1a\n' + b''.join(
+        len(data).to_bytes(4, 'big') + tag + data + zlib.crc32(tag + data).to_bytes(4, 'big')
+        for tag, data in ((b'IHDR', (1).to_bytes(4, 'big') * 2 + bytes([8, 0, 0, 0, 0])),
+                          (b'IDAT', zlib.compress(b'\x00\x80')),
+                          (b'IEND', b'')))).decode()
+
+def latency_sampler(spec: str):
+    """
+    Parse a latency distribution into a function drawing milliseconds from a random.Random
+    
+    Args:
+        spec: "fixed:MS", "uniform:LOW:HIGH", "normal:MEAN:STDDEV" or "lognormal:MEDIAN:SIGMA",
+            all in milliseconds except SIGMA
+    
+    Raises:
+        ValueError: If the spec is not one of these
+    """
+    kind, _, rest = spec.partition(':')
+    try:
+        values = [float(value) for value in rest.split(':')] if rest else []
+    except ValueError:
+        raise ValueError(f"Invalid latency distribution '{spec}'")
+    samplers = {
+        'fixed': (1, lambda rng: values[0]),
+        'uniform': (2, lambda rng: rng.uniform(values[0], values[1])),
+        'normal': (2, lambda rng: rng.gauss(values[0], values[1])),
+        'lognormal': (2, lambda rng: values[0] * math.exp(rng.gauss(0, values[1]))),
+    }
+    if kind not in samplers or len(values) != samplers[kind][0]:
+        raise ValueError(f"Invalid latency distribution '{spec}'; expected fixed:MS, uniform:LOW:HIGH, "
+                         "normal:MEAN:STDDEV or lognormal:MEDIAN:SIGMA")
+    sample = samplers[kind][1]
+    return lambda rng: max(0.0, sample(rng))
+
+@dataclass
+class FakeModelProfile:
+    """How the fake Bedrock server answers one model"""
+    latency: str = 'lognormal:400:0.3'  # Time to the first token, see latency_sampler
+    tokens_per_second: float = 80.0
+    throttle_rate: float = 0.0  # Probability of answering ThrottlingException
+    output_tokens: int = FAKE_OUTPUT_TOKENS
+    text: Optional[str] = None  # Canned reply; generated filler (or a judge verdict) if None
+
+class FakeBedrock:
+    """
+    The behaviour of the fake Bedrock runtime: which reply each request gets, and when
+    
+    Profiles are looked up by model ID, exactly or by glob (e.g. "*nova-pro*"),
+    falling back to the default profile.
+    """
+    def __init__(self, default: FakeModelProfile, models: Optional[dict[str, FakeModelProfile]] = None,
+                 max_concurrency: Optional[int] = None, seed: Optional[int] = None):
+        self.default = default
+        self.models = models or {}
+        self.max_concurrency = max_concurrency
+        # Drives simulated latency and throttling only; not security related
+        self._rng = random.Random(seed)  # nosec B311
+        self._samplers = {}
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.stats: Counter = Counter()
+    
+    @classmethod
+    def from_file(cls, path: Path, default: FakeModelProfile, **options) -> 'FakeBedrock':
+        """
+        Load per-model profiles from a JSON file
+        
+        The file holds {"default": {...}, "models": {"<model ID or glob>": {...}}}, each
+        entry giving FakeModelProfile fields; unset fields come from default.
+        """
+        with open(path) as f:
+            config = json.load(f)
+        default = FakeModelProfile(**{**asdict(default), **config.get('default', {})})
+        models = {pattern: FakeModelProfile(**{**asdict(default), **fields})
+                  for pattern, fields in config.get('models', {}).items()}
+        return cls(default, models, **options)
+    
+    def profile(self, model_id: str) -> FakeModelProfile:
+        if model_id in self.models:
+            return self.models[model_id]
+        for pattern, profile in self.models.items():
+            if fnmatch.fnmatchcase(model_id, pattern):
+                return profile
+        return self.default
+    
+    def admit(self, operation: str, model_id: str) -> bool:
+        """Start a request, or return False if it should be throttled"""
+        profile = self.profile(model_id)
+        with self._lock:
+            throttled = (self._rng.random() < profile.throttle_rate
+                         or (self.max_concurrency is not None and self.in_flight >= self.max_concurrency))
+            self.stats[(operation, model_id, 'throttled' if throttled else 'served')] += 1
+            if not throttled:
+                self.in_flight += 1
+            return not throttled
+    
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+    
+    def timing(self, model_id: str) -> tuple[float, float]:
+        """Seconds to the first token, and seconds per further token, for one reply"""
+        profile = self.profile(model_id)
+        with self._lock:
+            if profile.latency not in self._samplers:
+                self._samplers[profile.latency] = latency_sampler(profile.latency)
+            first_token = self._samplers[profile.latency](self._rng) / 1000
+        return first_token, 1 / profile.tokens_per_second
+    
+    def reply(self, model_id: str, request: dict) -> tuple[str, str]:
+        """
+        The reply text and stop reason for a request
+        
+        Judge prompts (anything asking for a <response_choice>) get a verdict, continuing
+        the fast judge's prefill if there is one. Stop sequences and the token limit of
+        the request are applied to every reply.
+        """
+        profile = self.profile(model_id)
+        prompt = '\n'.join(_request_texts(request.get('system')) + _request_texts(request.get('messages'))
+                           + _request_texts(request.get('textToImageParams')))
+        messages = request.get('messages') or [{}]
+        prefill = '\n'.join(_request_texts(messages[-1])) if messages[-1].get('role') == 'assistant' else ''
+        if profile.text is not None:
+            text = profile.text
+        elif '<response_choice>' in prompt and prefill.rstrip().endswith('<response_choice>'):
+            text = "new_response</response_choice>\n<confidence>90</confidence>"
+        elif '<response_choice>' in prompt:
+            text = ("<thinking>Both responses answer the prompt.</thinking>\n"
+                    "<explanation>Canned verdict from the fake Bedrock server.</explanation>\n"
+                    "<response_choice>new_response</response_choice>")
+        else:
+            filler = [FAKE_FILLER_WORDS[i % len(FAKE_FILLER_WORDS)] for i in range(max(0, profile.output_tokens - 5))]
+            text = f"Canned response from {model_id}. " + ' '.join(filler)
+        
+        config = request.get('inferenceConfig') or {}
+        stop_reason = 'end_turn'
+        for stop in config.get('stopSequences') or request.get('stop_sequences') or []:
+            if stop in text:
+                text, stop_reason = text[:text.index(stop)], 'stop_sequence'
+        max_tokens = config.get('maxTokens') or config.get('max_new_tokens') or request.get('max_tokens')
+        words = text.split(' ')
+        if max_tokens and len(words) > max_tokens:
+            text, stop_reason = ' '.join(words[:max_tokens]), 'max_tokens'
+        return text, stop_reason
+
+def _request_texts(value) -> list[str]:
+    """Every text and string content field in (part of) a request, in order"""
+    if isinstance(value, dict):
+        texts = [value[key] for key in ('text', 'content') if isinstance(value.get(key), str)]
+        return texts + [text for key, item in value.items() if not isinstance(item, str) for text in _request_texts(item)]
+    if isinstance(value, list):
+        return [text for item in value for text in _request_texts(item)]
+    return []
+
+def _token_count(text: str) -> int:
+    return len(text.split())
+
+def encode_event(event_type: str, payload: dict) -> bytes:
+    """One application/vnd.amazon.eventstream message, as ConverseStream sends them"""
+    headers = b''
+    for name, value in ((':event-type', event_type), (':content-type', 'application/json'), (':message-type', 'event')):
+        name, value = name.encode(), value.encode()
+        headers += bytes([len(name)]) + name + bytes([7]) + len(value).to_bytes(2, 'big') + value  # 7: string
+    body = json.dumps(payload).encode()
+    prelude = (12 + len(headers) + len(body) + 4).to_bytes(4, 'big') + len(headers).to_bytes(4, 'big')
+    message = prelude + zlib.crc32(prelude).to_bytes(4, 'big') + headers + body
+    return message + zlib.crc32(message).to_bytes(4, 'big')
+
+class FakeBedrockHandler(http.server.BaseHTTPRequestHandler):
+    """Serve Converse, ConverseStream and InvokeModel the way bedrock-runtime does"""
+    protocol_version = 'HTTP/1.1'  # Keep connections open, as clients pool them
+    
+    def log_message(self, format, *args):
+        pass  # One line per request would swamp the log under load
+    
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('x-amzn-RequestId', str(uuid.uuid4()))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _send_error(self, status: int, code: str, message: str):
+        self._send_json(status, {'message': message}, {'x-amzn-ErrorType': code})
+    
+    def _send_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+    
+    def do_POST(self):
+        fake: FakeBedrock = self.server.fake
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        match = re.fullmatch(r'/model/([^/]+)/(converse|converse-stream|invoke)', urllib.parse.urlsplit(self.path).path)
+        if not match:
+            self._send_error(404, 'UnknownOperationException', f"Unsupported path {self.path}")
+            return
+        model_id, operation = urllib.parse.unquote(match.group(1)), match.group(2)
+        try:
+            request = json.loads(body)
+        except ValueError:
+            self._send_error(400, 'ValidationException', "Request body is not valid JSON")
+            return
+        if not isinstance(request, dict):
+            self._send_error(400, 'ValidationException', "Request body must be a JSON object")
+            return
+        if not fake.admit(operation, model_id):
+            self._send_error(429, 'ThrottlingException', "Too many requests, please wait before trying again.")
+            return
+        try:
+            started = time.monotonic()
+            first_token, per_token = fake.timing(model_id)
+            if operation == 'converse-stream':
+                self._stream(fake, model_id, request, started, first_token, per_token)
+            elif operation == 'invoke' and 'taskType' in request:
+                time.sleep(first_token)
+                count = (request.get('imageGenerationConfig') or {}).get('numberOfImages', 1)
+                self._send_json(200, {'images': [FAKE_PNG] * count})
+            else:
+                text, stop_reason = fake.reply(model_id, request)
+                input_tokens, output_tokens = _token_count('\n'.join(_request_texts(request))), _token_count(text)
+                time.sleep(first_token + output_tokens * per_token)
+                latency_ms = int((time.monotonic() - started) * 1000)
+                if operation == 'converse':
+                    self._send_json(200, {
+                        'output': {'message': {'role': 'assistant', 'content': [{'text': text}]}},
+                        'stopReason': stop_reason,
+                        'usage': {'inputTokens': input_tokens, 'outputTokens': output_tokens,
+                                  'totalTokens': input_tokens + output_tokens},
+                        'metrics': {'latencyMs': latency_ms}})
+                    return
+                headers = {'X-Amzn-Bedrock-Input-Token-Count': str(input_tokens),
+                           'X-Amzn-Bedrock-Output-Token-Count': str(output_tokens),
+                           'X-Amzn-Bedrock-Invocation-Latency': str(latency_ms)}
+                if 'anthropic_version' in request:
+                    self._send_json(200, {
+                        'id': f"msg_{uuid.uuid4().hex}", 'type': 'message', 'role': 'assistant', 'model': model_id,
+                        'content': [{'type': 'text', 'text': text}], 'stop_reason': stop_reason,
+                        'usage': {'input_tokens': input_tokens, 'output_tokens': output_tokens}}, headers)
+                else:
+                    self._send_json(200, {
+                        'output': {'message': {'role': 'assistant', 'content': [{'text': text}]}},
+                        'stopReason': stop_reason,
+                        'usage': {'inputTokens': input_tokens, 'outputTokens': output_tokens,
+                                  'totalTokens': input_tokens + output_tokens}}, headers)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client gave up, e.g. on its read timeout
+        finally:
+            fake.release()
+    
+    def _stream(self, fake: FakeBedrock, model_id: str, request: dict, started: float,
+                first_token: float, per_token: float):
+        """Answer ConverseStream, sending one contentBlockDelta per word at the profile's token rate"""
+        text, stop_reason = fake.reply(model_id, request)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/vnd.amazon.eventstream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('x-amzn-RequestId', str(uuid.uuid4()))
+        self.end_headers()
+        self._send_chunk(encode_event('messageStart', {'role': 'assistant'}))
+        time.sleep(first_token)
+        words = text.split(' ')
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(per_token)
+            delta = word if i == len(words) - 1 else word + ' '
+            self._send_chunk(encode_event('contentBlockDelta', {'contentBlockIndex': 0, 'delta': {'text': delta}}))
+        self._send_chunk(encode_event('contentBlockStop', {'contentBlockIndex': 0}))
+        self._send_chunk(encode_event('messageStop', {'stopReason': stop_reason}))
+        input_tokens, output_tokens = _token_count('\n'.join(_request_texts(request))), _token_count(text)
+        self._send_chunk(encode_event('metadata', {
+            'usage': {'inputTokens': input_tokens, 'outputTokens': output_tokens,
+                      'totalTokens': input_tokens + output_tokens},
+            'metrics': {'latencyMs': int((time.monotonic() - started) * 1000)}}))
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+def serve_fake_bedrock(fake: FakeBedrock, host: str = '127.0.0.1', port: int = FAKE_BEDROCK_PORT) -> http.server.ThreadingHTTPServer:
+    """
+    Start a fake Bedrock runtime server on a background thread
+    
+    Returns:
+        http.server.ThreadingHTTPServer: The running server; call shutdown() to stop it
+    """
+    server = http.server.ThreadingHTTPServer((host, port), FakeBedrockHandler)
+    server.daemon_threads = True
+    server.fake = fake
+    threading.Thread(target=server.serve_forever, name='fake-bedrock', daemon=True).start()
+    return server
+
+def main(argv: Optional[list[str]] = None, prog: Optional[str] = None) -> int:
+    """Command line entry point, also run as the fake-bedrock subcommand of test_examples.py"""
+    parser = argparse.ArgumentParser(prog=prog, description='Serve a local stand-in for the Bedrock runtime (Converse, ConverseStream and InvokeModel) for load and performance tests. Point the runner at it with --endpoint-url.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1).')
+    parser.add_argument('--port', type=int, default=FAKE_BEDROCK_PORT, help=f'Port to listen on (default: {FAKE_BEDROCK_PORT}).')
+    parser.add_argument('--latency', default=FakeModelProfile.latency, help=f'Distribution of the time to first token: fixed:MS, uniform:LOW:HIGH, normal:MEAN:STDDEV or lognormal:MEDIAN:SIGMA (default: {FakeModelProfile.latency}).')
+    parser.add_argument('--tokens-per-second', type=float, default=FakeModelProfile.tokens_per_second, help=f'Rate at which reply tokens are generated (default: {FakeModelProfile.tokens_per_second:g}).')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Probability (0-1) of answering a request with ThrottlingException (default: 0).')
+    parser.add_argument('--output-tokens', type=int, default=FAKE_OUTPUT_TOKENS, help=f'Length of generated replies, in tokens (default: {FAKE_OUTPUT_TOKENS}).')
+    parser.add_argument('--max-concurrency', type=int, help='Throttle requests beyond this many in flight.')
+    parser.add_argument('--models', type=Path, help='JSON file of per-model profiles: {"default": {...}, "models": {"<model ID or glob>": {"latency": ..., "tokens_per_second": ..., "throttle_rate": ..., "output_tokens": ..., "text": ...}}}.')
+    parser.add_argument('--seed', type=int, help='Seed for latencies and throttling, for repeatable runs.')
+    args = parser.parse_args(argv)
+    try:
+        latency_sampler(args.latency)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.tokens_per_second <= 0:
+        parser.error('--tokens-per-second must be positive')
+    if not 0 <= args.throttle_rate <= 1:
+        parser.error('--throttle-rate must be between 0 and 1')
+    
+    default = FakeModelProfile(args.latency, args.tokens_per_second, args.throttle_rate, args.output_tokens)
+    options = {'max_concurrency': args.max_concurrency, 'seed': args.seed}
+    fake = (FakeBedrock.from_file(args.models, default, **options) if args.models
+            else FakeBedrock(default, **options))
+    server = serve_fake_bedrock(fake, args.host, args.port)
+    logger.info(f"Fake Bedrock runtime listening on http://{args.host}:{server.server_address[1]}")
+    # Stop on Ctrl+C, or on SIGTERM when run in the background (e.g. by CI)
+    stopping = threading.Event()
+    for stop_signal in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(stop_signal, lambda signum, frame: stopping.set())
+    while not stopping.wait(1):
+        pass
+    server.shutdown()
+    lines = [f"{'Operation':<16}  {'Model':<50}  {'Served':>7}  {'Throttled':>9}"]
+    for operation, model_id in sorted({(operation, model_id) for operation, model_id, _ in fake.stats}):
+        lines.append(f"{operation:<16}  {model_id:<50}  {fake.stats[(operation, model_id, 'served')]:>7}  "
+                     f"{fake.stats[(operation, model_id, 'throttled')]:>9}")
+    logger.info("Requests:\n" + '\n'.join(lines))
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -9,10 +9,35 @@ import difflib
 import json
 import csv
 import boto3
+from botocore import UNSIGNED
+from botocore.config import Config
+from botocore.awsrequest import AWSResponse
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
 import re
+import fnmatch
 import time
 import threading
 import logging
+import multiprocessing
+import queue
+import runpy
+import io
+import contextlib
+import traceback
+import asyncio
+import hashlib
+import copy
+import bisect
+import base64
+import sqlite3
+import shutil
+import tempfile
+import random
+import yaml
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from typing import Optional
 
 # Configure logging
@@ -24,78 +49,626 @@ logging.basicConfig(
 # Global directory paths
 RESULTS_DIR = Path('results')
 COMPARISONS_DIR = RESULTS_DIR / 'comparisons'
-RPM = 10
+CACHE_DIR = RESULTS_DIR / '.cache'
+REPLAY_DIR = CACHE_DIR / 'replay'
+RPM = 10  # Starting calls per minute for each model bucket
+MIN_RPM = 1  # Floor the adaptive limiter backs off to after repeated throttling
+MAX_RPM = 60  # Ceiling the adaptive limiter probes up to while calls succeed, and the fixed rate of region buckets
+EXAMPLE_TIMEOUT = 30  # Seconds an example.py may run before it is abandoned, until it has a history
+EXAMPLE_TIMEOUT_MAX = 600  # Ceiling of the timeout budgets learned from history
+EXAMPLE_TIMEOUT_MARGIN = 2.0  # Learned budget is this multiple of the p99 of recent run times
+EXAMPLE_TIMEOUT_HISTORY = 50  # Recent runs of an example its budget is learned from
+EXAMPLE_MAX_ATTEMPTS = 3  # Runs of an example.py that times out or fails transiently
+RETRY_BASE_DELAY = 2.0  # Seconds; the backoff before attempt n is drawn from [0, RETRY_BASE_DELAY * 2**(n-1)]
+RETRY_MAX_DELAY = 60.0  # Ceiling of the retry backoff
+EXAMPLE_REGION = 'us-west-2'  # Region most examples create their client in
+JUDGE_MODEL_ID = 'us.anthropic.claude-3-5-sonnet-20241022-v2:0'
+CLIENT_CONNECT_TIMEOUT = 10  # Seconds to establish a connection to Bedrock
+CLIENT_READ_TIMEOUT = 300  # Seconds to wait for a response; reasoning examples can be slow
+JUDGE_CACHE_MAX_ENTRIES = 5000  # Least recently used verdicts beyond this are evicted
+JUDGE_CACHE_MAX_AGE_DAYS = 30  # Verdicts older than this are evicted
+PREJUDGE_THRESHOLD = 0.95  # Normalised similarity at or above which the old result is kept without judging
+DIFF_CONTEXT_LINES = 3  # Unchanged lines shown around each change in diff judging
+DIFF_FALLBACK_RATIO = 0.5  # Diffs larger than this fraction of the longer response are judged in full
+JUDGE_PROMPT_SECTION_CHARS = 2000  # Longer prompt sections (e.g. documents) are trimmed in diff judging
+FAST_JUDGE_MODEL_ID = 'us.amazon.nova-lite-v1:0'
+FAST_JUDGE_MIN_CONFIDENCE = 80  # Fast verdicts below this confidence (0-100) are escalated to JUDGE_MODEL_ID
 
 logger_main = logging.getLogger('main')
 
+# Per-thread log buffer used to keep concurrent example logs grouped and ordered
+_log_context = threading.local()
+
+class ExampleLogBuffer(logging.Filter):
+    """Divert log records emitted on a worker thread into that thread's buffer.
+
+    Records emitted while an example runs on a worker thread are held back and
+    replayed on the main thread once the example finishes, so the log of a
+    concurrent run reads exactly like a sequential one.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        buffer = getattr(_log_context, 'records', None)
+        if buffer is None:
+            return True
+        buffer.append(record)
+        return False
+
+@dataclass
+class ExampleOutcome:
+    """Summary of a single example run, used for the end-of-run table"""
+    name: str
+    status: str
+    duration: float = 0.0
+    detail: str = ""
+    returncode: Optional[int] = None  # Exit code of example.py, if it ran to completion
+
+# Bedrock error codes that mean "slow down" rather than "this request is wrong"
+THROTTLING_ERROR_CODES = ('ThrottlingException', 'ServiceUnavailableException', 'TooManyRequestsException')
+
+class _Bucket:
+    """Reservation schedule for one named rate limit bucket"""
+    def __init__(self, calls_per_minute: float):
+        self.set_rate(calls_per_minute)
+        # Start times of calls granted in the last minute (including future reservations)
+        self.slots: deque[float] = deque()
+    
+    def set_rate(self, calls_per_minute: float):
+        self.calls_per_minute = calls_per_minute
+        self.min_interval = 60.0 / calls_per_minute
+    
+    def next_slot(self, now: float, earliest: Optional[float] = None) -> float:
+        """Earliest time from earliest (default: now) a new call may start without breaking this bucket's limit"""
+        while self.slots and now - self.slots[0] >= 60:
+            self.slots.popleft()
+        slot = now if earliest is None else max(now, earliest)
+        if self.slots:
+            # Keep calls uniformly spaced throughout the minute
+            slot = max(slot, self.slots[-1] + self.min_interval)
+            # ...and never more than calls_per_minute in any sliding minute
+            limit = int(self.calls_per_minute)
+            if limit and len(self.slots) >= limit:
+                slot = max(slot, self.slots[-limit] + 60)
+        return slot
+    
+    def book(self, slot: float):
+        """Record a call granted at slot, no earlier than next_slot() allowed"""
+        self.slots.append(slot)
+
+class _CeilingBucket(_Bucket):
+    """Reservation schedule for a limit shared with other buckets, e.g. a whole region
+    
+    Calls are booked here at slots chosen by their own buckets too, so a slow
+    bucket books slots far ahead. Slots are kept in order and a new call may take
+    any gap of min_interval between them instead of queueing behind the latest
+    booking; the uniform spacing alone keeps it within calls_per_minute.
+    """
+    def next_slot(self, now: float, earliest: Optional[float] = None) -> float:
+        while self.slots and now - self.slots[0] >= 60:
+            self.slots.popleft()
+        slot = now if earliest is None else max(now, earliest)
+        for booked in self.slots:
+            if booked + self.min_interval <= slot:
+                continue
+            if booked - self.min_interval >= slot:
+                break
+            slot = booked + self.min_interval
+        return slot
+    
+    def book(self, slot: float):
+        bisect.insort(self.slots, slot)
+
 class RateLimiter:
-    """Rate limiter for API calls with a per-minute limit that ensures uniform distribution"""
+    """Rate limiter for API calls with a per-minute limit that ensures uniform distribution
+    
+    Calls are scheduled GCRA-style: each caller reserves the next free start time in
+    every bucket it names (e.g. a model ID and a region), and the reservation is made
+    under the lock while the sleep until that time happens outside it. Concurrent
+    callers therefore queue up on distinct slots instead of behind one sleeping thread.
+    Calling wait() with no keys uses a single default bucket, as before.
+    """
+    DEFAULT_BUCKET = 'default'
+    
     def __init__(self, calls_per_minute: int):
         self.calls_per_minute = calls_per_minute
-        self.calls: list[float] = []
+        # Minimum interval between requests (in seconds) for buckets at the default rate
+        self.min_interval = 60.0 / calls_per_minute
+        self.buckets: dict[str, _Bucket] = {}
         self.lock = threading.Lock()
         self.logger = logging.getLogger('RateLimiter')
-        # Calculate minimum interval between requests (in seconds)
-        self.min_interval = 60.0 / calls_per_minute
-
-    def wait(self):
-        """Wait to ensure uniform distribution of requests throughout a minute"""
-        now = time.time()
+    
+    def set_rate(self, key: str, calls_per_minute: float):
+        """Give the named bucket its own per-minute limit"""
         with self.lock:
-            # Remove calls older than 1 minute
-            original_calls = len(self.calls)
-            self.calls = [t for t in self.calls if now - t < 60]
-            removed_calls = original_calls - len(self.calls)
-            if removed_calls > 0:
-                self.logger.info(f"Cleaned up {removed_calls} old calls. Current calls in window: {len(self.calls)}")
-            
-            # Enforce minimum interval between requests for uniform distribution
-            if self.calls:  # If we've made calls before
-                # Calculate time since last call
-                time_since_last = now - self.calls[-1]
-                
-                # If we need to wait to maintain the interval
-                if time_since_last < self.min_interval:
-                    sleep_time = self.min_interval - time_since_last
-                    self.logger.info(f"Waiting {sleep_time:.2f}s to maintain uniform rate ({self.calls_per_minute} calls/minute)...")
-                    time.sleep(sleep_time)
-                    now = time.time()  # Update current time
-            
-            # Also enforce the overall rate limit using sliding window
-            if len(self.calls) >= self.calls_per_minute:
-                # Wait until the oldest call is more than 1 minute old
-                sleep_time = 60 - (now - self.calls[0])
-                if sleep_time > 0:
-                    self.logger.info(f"Rate limit reached ({len(self.calls)} calls in last minute). Waiting {sleep_time:.2f} seconds...")
-                    time.sleep(sleep_time)
-                    # After waiting, remove calls older than 1 minute
-                    now = time.time()
-                    self.calls = [t for t in self.calls if now - t < 60]
-                    self.logger.info(f"Resumed after waiting. Current calls in window: {len(self.calls)}")
+            self._bucket(key).set_rate(calls_per_minute)
+    
+    def _bucket(self, key: str) -> _Bucket:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = _Bucket(self.calls_per_minute)
+        return bucket
+    
+    def reserve(self, *keys: str) -> float:
+        """Reserve the next call slot in every named bucket
+        
+        Args:
+            keys: Bucket names the call counts against; none means the default bucket
             
-            self.calls.append(now)
-            self.logger.info(f"API call recorded. Current calls in window: {len(self.calls)}/{self.calls_per_minute}")
+        Returns:
+            float: Seconds the caller must wait before making the call
+        """
+        now = time.monotonic()
+        with self.lock:
+            buckets = [self._bucket(key) for key in (keys or (self.DEFAULT_BUCKET,))]
+            # The first slot every bucket allows; each bucket only ever moves it later
+            slot = now
+            while True:
+                latest = max(bucket.next_slot(now, slot) for bucket in buckets)
+                if latest == slot:
+                    break
+                slot = latest
+            for bucket in buckets:
+                bucket.book(slot)
+        return slot - now
+    
+    def wait(self, *keys: str):
+        """Block until a call against the named buckets is allowed"""
+        delay = self.reserve(*keys)
+        if delay > 0:
+            self.logger.debug(f"Waiting {delay:.2f}s for a call slot in {keys or (self.DEFAULT_BUCKET,)}")
+            time.sleep(delay)
+    
+    acquire = wait
+    
+    async def acquire_async(self, *keys: str):
+        """Asynchronous counterpart of wait() for use inside an event loop"""
+        delay = self.reserve(*keys)
+        if delay > 0:
+            self.logger.debug(f"Waiting {delay:.2f}s for a call slot in {keys or (self.DEFAULT_BUCKET,)}")
+            await asyncio.sleep(delay)
+
+class AdaptiveRateLimiter(RateLimiter):
+    """RateLimiter whose per-bucket rates follow Bedrock's throttling feedback (AIMD)
+    
+    Each successful call adds increase_step calls/minute to the buckets it used, up to
+    max_rpm; each throttling response multiplies their rate by decrease_factor, down
+    to min_rpm. Buckets are keyed the same way as for wait(), so every model (and the
+    judge model) converges on its own sustainable rate.
+    
+    Region buckets ("region:<name>") are shared by every model in the region and are
+    not adapted: they stay a fixed ceiling of max_rpm, so one model's throttling does
+    not slow the others.
+    """
+    CEILING_PREFIX = 'region:'
+    
+    def __init__(self, calls_per_minute: int, min_rpm: float = MIN_RPM, max_rpm: float = MAX_RPM,
+                 increase_step: float = 1.0, decrease_factor: float = 0.5):
+        super().__init__(calls_per_minute)
+        self.min_rpm = min_rpm
+        self.max_rpm = max_rpm
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+    
+    def _bucket(self, key: str) -> _Bucket:
+        if key not in self.buckets and key.startswith(self.CEILING_PREFIX):
+            self.buckets[key] = _CeilingBucket(self.max_rpm)
+        return super()._bucket(key)
+    
+    def _adapted(self, keys: tuple) -> list[str]:
+        """The named buckets whose rate follows throttling feedback"""
+        return [key for key in keys or (self.DEFAULT_BUCKET,) if not key.startswith(self.CEILING_PREFIX)]
+    
+    def record_success(self, *keys: str):
+        """Additively raise the rate of the named model buckets after a successful call"""
+        with self.lock:
+            for key in self._adapted(keys):
+                bucket = self._bucket(key)
+                bucket.set_rate(min(self.max_rpm, bucket.calls_per_minute + self.increase_step))
+    
+    def record_throttle(self, *keys: str):
+        """Multiplicatively cut the rate of the named model buckets after a throttling response"""
+        with self.lock:
+            for key in self._adapted(keys):
+                bucket = self._bucket(key)
+                bucket.set_rate(max(self.min_rpm, bucket.calls_per_minute * self.decrease_factor))
+                self.logger.warning(f"Throttled on {key}, backing off to {bucket.calls_per_minute:.1f} calls/minute")
+    
+    def rates(self) -> dict[str, float]:
+        """Current calls/minute of every bucket seen so far"""
+        with self.lock:
+            return {key: bucket.calls_per_minute for key, bucket in self.buckets.items()}
 
-# Global rate limiter instance (N calls per minute)
-bedrock_rate_limiter = RateLimiter(RPM)
+def is_throttling_error(error: Exception) -> bool:
+    """Return True if a botocore error is Bedrock asking us to slow down"""
+    return isinstance(error, ClientError) and error.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
 
-def judge_with_model(old_content: str, new_content: str, prompt: str = "No prompt provided") -> tuple[float, str]:
-    """Use LLM to compare results and choose the best answer
+def is_throttled_output(stderr: str) -> bool:
+    """Return True if an example script failed because Bedrock throttled it"""
+    return any(code in stderr for code in THROTTLING_ERROR_CODES)
+
+# Errors that say nothing about the example itself, so running it again may succeed
+TRANSIENT_ERROR_CODES = THROTTLING_ERROR_CODES + (
+    'InternalServerException', 'ModelNotReadyException', 'ModelTimeoutException',
+    'EndpointConnectionError', 'ConnectTimeoutError', 'ReadTimeoutError', 'ConnectionClosedError')
+
+def is_transient_output(stderr: str) -> bool:
+    """Return True if an example script failed in a way worth retrying"""
+    return any(code in stderr for code in TRANSIENT_ERROR_CODES)
+
+# Global rate limiter instance (starts at RPM calls per minute per bucket and adapts)
+bedrock_rate_limiter = AdaptiveRateLimiter(RPM)
+
+class ReplayMissError(Exception):
+    """Raised in replay mode when a request has no recorded response"""
+
+def _encode_for_store(value):
+    """Make a botocore response JSON-serialisable, reading streaming bodies into bytes"""
+    if isinstance(value, StreamingBody):
+        value = value.read()
+    if isinstance(value, (bytes, bytearray)):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, dict):
+        return {key: _encode_for_store(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode_for_store(item) for item in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+def _decode_from_store(value):
+    """Inverse of _encode_for_store (streaming bodies come back as plain bytes)"""
+    if isinstance(value, dict):
+        if set(value) == {'__bytes__'}:
+            return base64.b64decode(value['__bytes__'])
+        return {key: _decode_from_store(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode_from_store(item) for item in value]
+    return value
+
+def canonical_request_key(operation_name: str, params: dict) -> str:
+    """
+    Hash a Bedrock request by operation, model ID and canonicalised body
+    
+    JSON bodies passed as strings or bytes (InvokeModel) are parsed first, so
+    formatting differences between callers do not change the key.
+    """
+    params = dict(params)
+    model_id = params.pop('modelId', '')
+    body = params.get('body')
+    if isinstance(body, (str, bytes, bytearray)):
+        try:
+            params['body'] = json.loads(body)
+        except ValueError:
+            pass
+    canonical = json.dumps(_encode_for_store(params), sort_keys=True, separators=(',', ':'))
+    return content_hash(operation_name, model_id, canonical)
+
+class ReplayStore:
+    """Content-addressed store of recorded Bedrock responses (one JSON file per request key)
+    
+    The root is made absolute when the store is created, so examples that run with
+    another working directory (see example_workdir) still read and write it.
+    """
+    def __init__(self, root: Path):
+        self.root = Path(root).resolve()
+    
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+    
+    def get(self, key: str) -> Optional[dict]:
+        """Return the recorded response for key, or None"""
+        try:
+            with open(self.path(key)) as f:
+                return _decode_from_store(json.load(f)['response'])
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    def put(self, key: str, operation_name: str, response: dict):
+        """Record a response, replacing any earlier recording atomically"""
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(path, json.dumps({'operation': operation_name, 'response': _encode_for_store(response)}))
+
+# 'off', 'record' (replay hits, call and store misses), 'replay' (never call Bedrock)
+# or 'refresh' (always call and overwrite); see install_replay_hooks
+REPLAY_MODES = ('off', 'record', 'replay', 'refresh')
+replay_mode = 'off'
+replay_store: Optional[ReplayStore] = None
+_replay_store_lock = threading.Lock()
+
+def get_replay_store() -> ReplayStore:
+    """The shared replay store under REPLAY_DIR, resolved against the working directory on first use"""
+    global replay_store
+    with _replay_store_lock:
+        if replay_store is None:
+            replay_store = ReplayStore(REPLAY_DIR)
+        return replay_store
+
+def install_replay_hooks(client, mode: Optional[str] = None, store: Optional[ReplayStore] = None):
+    """
+    Record or replay a bedrock-runtime client's Converse and InvokeModel calls
+    
+    Uses botocore's event system: the request key is computed from the call
+    parameters before they are serialised, a recorded response short-circuits the
+    call in before-call, and live responses are stored from after-call.
     
     Args:
-        old_content: The content of the old response
-        new_content: The content of the new response
-        prompt: The prompt that was used to generate the responses
+        client: A bedrock-runtime client
+        mode: One of REPLAY_MODES; defaults to the module-level replay_mode
+        store: Where responses live; defaults to the shared store (get_replay_store)
+    """
+    mode = mode or replay_mode
+    if mode == 'off':
+        return
+    store = store or get_replay_store()
+    events = client.meta.events
+    
+    def compute_key(params, model, context, **kwargs):
+        context['replay_key'] = canonical_request_key(model.name, params)
+    
+    def replay(model, context, **kwargs):
+        if mode == 'refresh':
+            return None
+        response = store.get(context['replay_key'])
+        if response is None:
+            if mode == 'replay':
+                raise ReplayMissError(f"No recorded response for {model.name} request {context['replay_key']}")
+            return None
+        if model.name == 'InvokeModel':
+            body = response.get('body', b'')
+            response['body'] = StreamingBody(io.BytesIO(body), len(body))
+        context['replayed'] = True
+        return AWSResponse(url='', status_code=200, headers={}, raw=None), response
+    
+    def record(http_response, parsed, model, context, **kwargs):
+        if context.get('replayed') or http_response.status_code >= 300:
+            return
+        if model.name == 'InvokeModel':
+            # Read the stream for the store, then hand the caller an unread copy
+            body = parsed['body'].read()
+            parsed['body'] = StreamingBody(io.BytesIO(body), len(body))
+        store.put(context['replay_key'], model.name, parsed)
+        if model.name == 'InvokeModel':
+            parsed['body'] = StreamingBody(io.BytesIO(body), len(body))
+    
+    for operation in ('Converse', 'InvokeModel'):
+        events.register(f"before-parameter-build.bedrock-runtime.{operation}", compute_key)
+        events.register(f"before-call.bedrock-runtime.{operation}", replay)
+        events.register(f"after-call.bedrock-runtime.{operation}", record)
+
+# When True, Converse examples are sent from example.json through converse_stream
+stream_mode = False
+
+# Per-call timings collected while a warm worker runs an example; None when not collecting
+_call_timings: Optional[list[dict]] = None
+
+def install_timing_hooks(client):
+    """
+    Record when each Bedrock call was sent and when its response arrived
+    
+    Timings are appended to _call_timings while it is a list. For non-streaming
+    calls the body arrives with the headers, so ttfb_ms is the full round trip.
+    """
+    sent_at = {}
+    
+    def before_send(request, **kwargs):
+        sent_at[threading.get_ident()] = time.perf_counter()
+    
+    def response_received(context, **kwargs):
+        started = sent_at.pop(threading.get_ident(), None)
+        if _call_timings is not None and started is not None:
+            _call_timings.append({'ttfb_ms': (time.perf_counter() - started) * 1000})
+    
+    client.meta.events.register('before-send.bedrock-runtime', before_send)
+    client.meta.events.register('response-received.bedrock-runtime', response_received)
+
+# Shared bedrock-runtime clients, keyed by region and config overrides
+_bedrock_clients: dict[tuple, object] = {}
+_bedrock_clients_lock = threading.Lock()
+# Connections each client keeps open; raised by run_examples so that every execute and
+# judge worker can hold one at the same time
+client_pool_size = 10
+# Bedrock endpoint to call instead of AWS (e.g. a fake-bedrock server); None for the default
+endpoint_url: Optional[str] = None
+
+def get_bedrock_client(region_name: Optional[str] = None, **config_overrides):
+    """
+    Return a shared bedrock-runtime client, creating it on first use
+    
+    Clients are thread-safe once built, so one client per region and config is kept
+    for the life of the process and its connection pool is reused across calls.
+    
+    Args:
+        region_name: AWS region, or None for the default region of the environment
+        config_overrides: botocore Config options replacing the tuned defaults
         
     Returns:
-        tuple[float, str]: A tuple containing the best answer chosen and explanation
+        A botocore client for bedrock-runtime
     """
-    # Wait for rate limit if necessary
-    bedrock_rate_limiter.wait()
+    key = (region_name, tuple(sorted((name, repr(value)) for name, value in config_overrides.items())))
+    with _bedrock_clients_lock:
+        client = _bedrock_clients.get(key)
+        if client is None:
+            options = {
+                'max_pool_connections': client_pool_size,
+                'retries': {'mode': 'adaptive', 'max_attempts': 3},
+                'connect_timeout': CLIENT_CONNECT_TIMEOUT,
+                'read_timeout': CLIENT_READ_TIMEOUT,
+                'tcp_keepalive': True,
+            }
+            options.update(config_overrides)
+            # boto3's default session is not thread-safe, so build from a private one
+            session = boto3.session.Session()
+            client = session.client('bedrock-runtime', region_name=region_name, endpoint_url=endpoint_url,
+                                    config=Config(**options))
+            install_replay_hooks(client)
+            install_timing_hooks(client)
+            _bedrock_clients[key] = client
+        return client
+
+def content_hash(*parts: str) -> str:
+    """SHA-256 over the given strings, length-prefixed so part boundaries are unambiguous"""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode('utf-8')
+        digest.update(f"{len(data)}:".encode())
+        digest.update(data)
+    return digest.hexdigest()
+
+def atomic_write_text(path: Path, text: str):
+    """Write text to path via a temporary file and rename, so readers never see a partial file"""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+class VerdictCache:
+    """On-disk SQLite cache of judge verdicts keyed by (judge model, prompt, old, new)
+    
+    Entries not used for max_age_days, or beyond max_entries by least recent use, are
+    evicted whenever the cache is opened and after each insert.
+    """
+    def __init__(self, path: Path, max_entries: int = JUDGE_CACHE_MAX_ENTRIES, max_age_days: float = JUDGE_CACHE_MAX_AGE_DAYS):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        # WAL with relaxed syncing keeps the last-used bookkeeping on lookups cheap
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts ("
+            "key TEXT PRIMARY KEY, response_choice TEXT NOT NULL, explanation TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS verdicts_last_used ON verdicts (last_used_at)")
+        self.evict()
+    
+    @staticmethod
+    def key(judge_model_id: str, prompt: str, old_content: str, new_content: str) -> str:
+        return content_hash(judge_model_id, prompt, old_content, new_content)
+    
+    def get(self, key: str) -> Optional[tuple[str, str]]:
+        """Return the cached (response_choice, explanation) for key, if any"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT response_choice, explanation FROM verdicts WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                self.conn.execute("UPDATE verdicts SET last_used_at = ? WHERE key = ?", (time.time(), key))
+                self.conn.commit()
+        return (row[0], row[1]) if row else None
+    
+    def put(self, key: str, response_choice: str, explanation: str):
+        """Store a verdict and evict old entries"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?)",
+                (key, response_choice, explanation, now, now)
+            )
+            self.conn.commit()
+        self.evict()
+    
+    def evict(self):
+        """Drop entries past the age limit, then the least recently used beyond max_entries"""
+        cutoff = time.time() - self.max_age_days * 86400
+        with self.lock:
+            self.conn.execute("DELETE FROM verdicts WHERE last_used_at < ?", (cutoff,))
+            self.conn.execute(
+                "DELETE FROM verdicts WHERE key IN ("
+                "SELECT key FROM verdicts ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.conn.commit()
+    
+    def clear(self):
+        """Remove every cached verdict"""
+        with self.lock:
+            self.conn.execute("DELETE FROM verdicts")
+            self.conn.commit()
+
+# Judge verdict cache; set to None (e.g. with --no-judge-cache) to always call the judge
+judge_cache: Optional[VerdictCache] = None
+
+# 'full' sends both complete responses to the judge, 'diff' a unified diff where it is compact
+JUDGE_MODES = ('full', 'diff')
+judge_mode = 'full'
+
+def _trim_middle(text: str, limit: int) -> str:
+    """Keep the start and end of text, replacing the middle with an omission marker"""
+    if len(text) <= limit:
+        return text
+    keep = limit // 2
+    return f"{text[:keep]}\n[... {len(text) - 2 * keep} characters omitted ...]\n{text[-keep:]}"
+
+def trim_prompt_for_judge(prompt: str, limit: int = JUDGE_PROMPT_SECTION_CHARS) -> str:
+    """
+    Shorten the bulky parts of a prompt while keeping its instructions intact
+    
+    Tagged sections (e.g. <document_content>) and paragraphs longer than limit
+    characters keep only their beginning and end.
+    """
+    prompt = re.sub(
+        r'(<(\w+)>)(.*?)(</\2>)',
+        lambda match: match.group(1) + _trim_middle(match.group(3), limit) + match.group(4),
+        prompt,
+        flags=re.DOTALL
+    )
+    return '\n\n'.join(_trim_middle(paragraph, limit) for paragraph in prompt.split('\n\n'))
+
+def compact_diff(old_content: str, new_content: str) -> Optional[str]:
+    """Unified diff from old to new, or None if it is larger than DIFF_FALLBACK_RATIO of the longer text"""
+    diff = '\n'.join(difflib.unified_diff(
+        old_content.splitlines(),
+        new_content.splitlines(),
+        fromfile='old_response',
+        tofile='new_response',
+        n=DIFF_CONTEXT_LINES,
+        lineterm=''
+    ))
+    if len(diff) > DIFF_FALLBACK_RATIO * max(len(old_content), len(new_content)):
+        return None
+    return diff
+
+def build_judge_prompt(old_content: str, new_content: str, prompt: str, mode: str = 'full') -> tuple[str, str]:
+    """
+    Build the judge instructions for a pair of responses
+    
+    In 'diff' mode the judge gets the prompt with long sections trimmed and a
+    unified diff of the two responses. If that diff is larger than
+    DIFF_FALLBACK_RATIO of the longer response it would not save much, so
+    both responses are sent in full instead.
     
-    bedrock = boto3.client('bedrock-runtime')
+    Returns:
+        tuple[str, str]: The judge prompt and the mode actually used
+    """
+    diff = compact_diff(old_content, new_content) if mode == 'diff' else None
+    if diff is not None:
+        return f"""Compare two responses received from a large language model based on a prompt and follow these instructions:
+        1. Read and understand what is being asked in the <prompt>. Long sections of the prompt have been shortened.
+        2. Read the <diff>. It is a unified diff from the old response to the new response: lines starting with "-" appear only in the old response, lines starting with "+" only in the new response, and lines starting with a space in both. Parts of the responses that are the same and far from any change are omitted.
+        3. Think through which of the two responses is a superior answer and why. Put your thoughts in <thinking>
+        4. Pick the best response and provide a short explanation of your selection in in 50 words or less under <explanation>
+        5. pick either "old_response" or "new_response" and put under <response_choice>
+
+        <prompt>
+        {trim_prompt_for_judge(prompt)}
+        </prompt>
+
+        <diff>
+        {diff}
+        </diff>
+        
+        <thinking>
+        """, 'diff'
     
-    prompt_text = f"""Compare the following two responses received from a large language model based on a prompt and follow these instructions:
+    return f"""Compare the following two responses received from a large language model based on a prompt and follow these instructions:
         1. Read and understand what is being asked in the <prompt>
         2. Think through which of the two responses is a superior answer and why. Put your thoughts in <thinking>
         3. Pick the best response and provide a short explanation of your selection in in 50 words or less under <explanation>
@@ -113,133 +686,535 @@ def judge_with_model(old_content: str, new_content: str, prompt: str = "No promp
         </new_response>
         
         <thinking>
-        """
+        """, 'full'
+
+def judge_cache_key(old_content: str, new_content: str, prompt: str) -> str:
+    """Verdict cache key of a pair as judged by JUDGE_MODEL_ID in the current judge_mode"""
+    # Diff-mode verdicts are cached separately from full-text ones
+    judge_id = JUDGE_MODEL_ID if judge_mode == 'full' else f"{JUDGE_MODEL_ID}:{judge_mode}"
+    return VerdictCache.key(judge_id, prompt, old_content, new_content)
+
+def judge_request_body(prompt_text: str) -> dict:
+    """The InvokeModel body sent to JUDGE_MODEL_ID for a judge prompt"""
+    return {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 1000,
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt_text
+            }
+        ]
+    }
+
+def parse_judge_response(response_text: str) -> tuple[str, str]:
+    """
+    Pull the response choice and explanation out of the judge's answer
+    
+    Args:
+        response_text: The text the judge model returned
+        
+    Returns:
+        tuple[str, str]: The response choice as written ("unknown" if there is none)
+            and the explanation
+    """
+    # Extract the response choice using regex - handle both closed and unclosed tags
+    # First try to find content between opening and closing tags
+    response_choice_match = re.search(r'<response_choice>\s*(.*?)\s*</response_choice>', response_text, re.DOTALL)
+    
+    if response_choice_match:
+        response_choice = response_choice_match.group(1).strip()
+    else:
+        # If no closing tag, try to extract content after the opening tag
+        # This will capture everything after <response_choice> until the end of the string
+        open_tag_match = re.search(r'<response_choice>\s*(.*?)(?:\s*$)', response_text, re.DOTALL)
+        
+        if open_tag_match:
+            # Extract and clean the content - look for potential end of content markers
+            raw_content = open_tag_match.group(1)
+            # Check if there are other XML tags that might indicate the end of the content
+            potential_end = re.search(r'<[^>]+>', raw_content)
+            if potential_end:
+                # If another tag starts, use content up to that point
+                response_choice = raw_content[:potential_end.start()].strip()
+            else:
+                response_choice = raw_content.strip()
+            logger_main.info(f"Found response choice with no closing tag: {response_choice}")
+        else:
+            response_choice = "unknown"
+            logger_main.info(f"Couldn't parse choice from text: {response_text}")
+    # Extract the explanation using regex
+    explanation_match = re.search(r'<explanation>\s*(.*?)\s*</explanation>', response_text, re.DOTALL)
+    explanation = explanation_match.group(1).strip() if explanation_match else "No explanation provided"
+    return response_choice, explanation
+
+# Verdict returned when the judge model could not be asked; neither response wins
+JUDGE_ERROR = "judge_error"
+
+def judge_with_model(old_content: str, new_content: str, prompt: str = "No prompt provided") -> tuple[float, str]:
+    """Use LLM to compare results and choose the best answer
+    
+    Args:
+        old_content: The content of the old response
+        new_content: The content of the new response
+        prompt: The prompt that was used to generate the responses
+        
+    Returns:
+        tuple[float, str]: A tuple containing the best answer chosen and explanation,
+        or JUDGE_ERROR and the error if the judge call failed
+    """
+    cache_key = judge_cache_key(old_content, new_content, prompt)
+    if judge_cache is not None:
+        cached = judge_cache.get(cache_key)
+        if cached:
+            logger_main.info(f"Using cached verdict: {cached[0]}")
+            record_judge_stat('cached')
+            _note_judge_call(JUDGE_MODEL_ID, None)
+            return cached
+    
+    bedrock = get_bedrock_client()
+    record_judge_stat('judged')
+    
+    # Wait for rate limit if necessary
+    rate_keys = (JUDGE_MODEL_ID, f"region:{bedrock.meta.region_name}")
+    if replay_mode != 'replay':
+        bedrock_rate_limiter.wait(*rate_keys)
+    
+    prompt_text, mode_used = build_judge_prompt(old_content, new_content, prompt, judge_mode)
+    if mode_used != judge_mode:
+        logger_main.info("Diff is too large to help; judging full responses")
+    elif mode_used == 'diff':
+        logger_main.info(f"Judging a {len(prompt_text)} character diff prompt instead of "
+                         f"{len(prompt) + len(old_content) + len(new_content)} characters of full text")
 
     try:
+        started = time.monotonic()
         response = bedrock.invoke_model(
-            modelId='us.anthropic.claude-3-5-sonnet-20241022-v2:0',
-            body=json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 1000,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt_text
-                    }
-                ]
-            })
+            modelId=JUDGE_MODEL_ID,
+            body=json.dumps(judge_request_body(prompt_text))
         )
         
+        elapsed = time.monotonic() - started
+        record_judge_latency('strong', elapsed)
+        _note_judge_call(JUDGE_MODEL_ID, elapsed * 1000)
+        bedrock_rate_limiter.record_success(*rate_keys)
+        
         response_body = json.loads(response['body'].read().decode())
         response_text = response_body['content'][0]['text']
         
-        # Extract the response choice using regex - handle both closed and unclosed tags
-        # First try to find content between opening and closing tags
-        response_choice_match = re.search(r'<response_choice>\s*(.*?)\s*</response_choice>', response_text, re.DOTALL)
-        
-        if response_choice_match:
-            response_choice = response_choice_match.group(1).strip()
-        else:
-            # If no closing tag, try to extract content after the opening tag
-            # This will capture everything after <response_choice> until the end of the string
-            open_tag_match = re.search(r'<response_choice>\s*(.*?)(?:\s*$)', response_text, re.DOTALL)
-            
-            if open_tag_match:
-                # Extract and clean the content - look for potential end of content markers
-                raw_content = open_tag_match.group(1)
-                # Check if there are other XML tags that might indicate the end of the content
-                potential_end = re.search(r'<[^>]+>', raw_content)
-                if potential_end:
-                    # If another tag starts, use content up to that point
-                    response_choice = raw_content[:potential_end.start()].strip()
-                else:
-                    response_choice = raw_content.strip()
-                logger_main.info(f"Found response choice with no closing tag: {response_choice}")
-            else:
-                response_choice = "unknown"
-                logger_main.info(f"Couldn't parse choice from text: {response_text}")
-        # Extract the explanation using regex
-        explanation_match = re.search(r'<explanation>\s*(.*?)\s*</explanation>', response_text, re.DOTALL)
-        explanation = explanation_match.group(1).strip() if explanation_match else "No explanation provided"
+        response_choice, explanation = parse_judge_response(response_text)
         logger_main.info(f"Response choice: {response_choice}\n\nExplanation: {explanation}")
-        return "new_response" if response_choice == "new_response" else "old_response", explanation
+        verdict = "new_response" if response_choice == "new_response" else "old_response"
+        # Unparseable verdicts are not worth remembering
+        if judge_cache is not None and response_choice in ("new_response", "old_response"):
+            judge_cache.put(cache_key, verdict, explanation)
+        return verdict, explanation
     except Exception as e:
+        if is_throttling_error(e):
+            bedrock_rate_limiter.record_throttle(*rate_keys)
         logger_main.error(f"Error in judge_with_model: {str(e)}")
-        return "old_response", f"Error occurred during model evaluation: {str(e)}"
+        _note_judge_call(JUDGE_MODEL_ID, None)
+        return JUDGE_ERROR, f"Error occurred during model evaluation: {str(e)}"
 
-def compare_results(prompt: str, old_results_path: Path, new_results_path: Path) -> tuple[bool, str]:
-    """Compare two result files using LLM and return superior one and the comparison details"""
-    if not old_results_path.exists() or not new_results_path.exists():
-        return False, "One or both result files do not exist"
+# How each comparison was resolved: 'exact', 'similar', 'cached', 'judged',
+# and with tiered judging 'fast' (decided by the fast tier) or 'escalated'
+judge_stats: Counter = Counter()
+# Seconds spent per judge model call, by tier ('fast' or 'strong')
+judge_tier_latencies: dict[str, list[float]] = {}
+_judge_stats_lock = threading.Lock()
+
+def record_judge_stat(kind: str):
+    with _judge_stats_lock:
+        judge_stats[kind] += 1
+
+def record_judge_latency(tier: str, seconds: float):
+    with _judge_stats_lock:
+        judge_tier_latencies.setdefault(tier, []).append(seconds)
+
+# The model whose verdict the current thread's last comparison used, and its call
+# latency (None for cached verdicts), for the comparison history
+_judge_call = threading.local()
+
+def _note_judge_call(model_id: str, latency_ms: Optional[float]):
+    _judge_call.model, _judge_call.latency_ms = model_id, latency_ms
+
+# Tiered judging: a fast model answers first and only low-confidence pairs reach JUDGE_MODEL_ID
+tiered_judge = False
+fast_judge_model_id = FAST_JUDGE_MODEL_ID
+fast_judge_min_confidence = FAST_JUDGE_MIN_CONFIDENCE
+
+def build_fast_judge_prompt(old_content: str, new_content: str, prompt: str) -> str:
+    """Build a prompt asking for a bare verdict and confidence, with no reasoning
     
-    with open(old_results_path) as old_file, open(new_results_path) as new_file:
-        old_content = old_file.read()
-        new_content = new_file.read()
+    The responses are sent as a unified diff when it is compact, in full otherwise.
+    """
+    diff = compact_diff(old_content, new_content)
+    if diff is not None:
+        responses = f"<diff>\n{diff}\n</diff>"
+        how = 'The <diff> is a unified diff from the old response to the new response ("-" lines only in the old, "+" lines only in the new).'
+    else:
+        responses = f"<old_response>\n{old_content}\n</old_response>\n\n<new_response>\n{new_content}\n</new_response>"
+        how = 'Both responses are given in full.'
+    return f"""Decide which of two responses from a large language model better answers the <prompt>. {how}
+Answer with exactly "old_response" or "new_response" in <response_choice>, then how confident you are, from 0 to 100, in <confidence>. Do not explain.
+
+<prompt>
+{trim_prompt_for_judge(prompt)}
+</prompt>
+
+{responses}"""
+
+def fast_judge(old_content: str, new_content: str, prompt: str) -> Optional[tuple[str, int]]:
+    """Ask the fast judge model for a constrained verdict and confidence
+    
+    The assistant turn is prefilled with <response_choice> and generation stops at
+    </confidence>, so the model can only emit the choice and a number.
+    
+    Args:
+        old_content: The content of the old response
+        new_content: The content of the new response
+        prompt: The prompt that was used to generate the responses
         
-    if old_content == new_content:
-        return True, "Results match exactly"
+    Returns:
+        Optional[tuple[str, int]]: The response choice and confidence, or None if the call
+        failed or its answer could not be parsed
+    """
+    bedrock = get_bedrock_client()
+    rate_keys = (fast_judge_model_id, f"region:{bedrock.meta.region_name}")
+    if replay_mode != 'replay':
+        bedrock_rate_limiter.wait(*rate_keys)
     
-    # Use Claude to compare the results
-    response_choice, explanation = judge_with_model(old_content, new_content, prompt)
+    try:
+        started = time.monotonic()
+        response = bedrock.converse(
+            modelId=fast_judge_model_id,
+            messages=[
+                {"role": "user", "content": [{"text": build_fast_judge_prompt(old_content, new_content, prompt)}]},
+                {"role": "assistant", "content": [{"text": "<response_choice>"}]}
+            ],
+            inferenceConfig={"maxTokens": 40, "temperature": 0, "stopSequences": ["</confidence>"]}
+        )
+        elapsed = time.monotonic() - started
+        record_judge_latency('fast', elapsed)
+        _note_judge_call(fast_judge_model_id, elapsed * 1000)
+        bedrock_rate_limiter.record_success(*rate_keys)
+    except Exception as e:
+        if is_throttling_error(e):
+            bedrock_rate_limiter.record_throttle(*rate_keys)
+        logger_main.error(f"Error in fast_judge: {str(e)}")
+        return None
     
-    # Create comparisons directory if it doesn't exist
-    COMPARISONS_DIR.mkdir(exist_ok=True, parents=True)
+    response_text = ''.join(block.get('text', '') for block in response['output']['message']['content'])
+    match = re.match(r'\s*(old_response|new_response)\s*(?:</response_choice>)?\s*<confidence>\s*(\d{1,3})',
+                     response_text)
+    if not match:
+        logger_main.info(f"Couldn't parse fast verdict from text: {response_text}")
+        return None
+    return match.group(1), min(int(match.group(2)), 100)
+
+def judge_pair(old_content: str, new_content: str, prompt: str = "No prompt provided") -> tuple[str, str]:
+    """Judge a pair of responses, with the fast tier first when tiered judging is on
     
-    # CSV file path
-    csv_path = COMPARISONS_DIR / 'comparisons.csv'
+    Args:
+        old_content: The content of the old response
+        new_content: The content of the new response
+        prompt: The prompt that was used to generate the responses
+        
+    Returns:
+        tuple[str, str]: The best answer chosen and explanation
+    """
+    if not tiered_judge:
+        return judge_with_model(old_content, new_content, prompt)
     
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    cache_key = VerdictCache.key(fast_judge_model_id, prompt, old_content, new_content)
+    if judge_cache is not None:
+        cached = judge_cache.get(cache_key)
+        if cached:
+            logger_main.info(f"Using cached fast verdict: {cached[0]}")
+            record_judge_stat('cached')
+            _note_judge_call(fast_judge_model_id, None)
+            return cached
     
-    # Check if file exists to determine if we need to write headers
-    file_exists = csv_path.exists()
+    fast_verdict = fast_judge(old_content, new_content, prompt)
+    if fast_verdict is not None and fast_verdict[1] >= fast_judge_min_confidence:
+        response_choice, confidence = fast_verdict
+        explanation = f"Decided by {fast_judge_model_id} with confidence {confidence}"
+        logger_main.info(f"Fast tier decided: {response_choice} (confidence {confidence})")
+        record_judge_stat('fast')
+        if judge_cache is not None:
+            judge_cache.put(cache_key, response_choice, explanation)
+        return response_choice, explanation
     
-    # Append to CSV file
-    with open(csv_path, 'a', newline='') as f:
-        writer = csv.writer(f)
-        
-        # Write headers if file is new
-        if not file_exists:
-            writer.writerow(['Timestamp', 'Old Content', 'New Content', 'Response Choice', 'Explanation'])
-        
-        # Write data row
-        writer.writerow([
-            timestamp,
-            old_content,
-            new_content,
-            response_choice,
-            explanation,
-        ])
+    if fast_verdict is None:
+        logger_main.info(f"Fast tier gave no verdict; escalating to {JUDGE_MODEL_ID}")
+    else:
+        logger_main.info(f"Fast tier unsure ({fast_verdict[0]}, confidence {fast_verdict[1]}); "
+                         f"escalating to {JUDGE_MODEL_ID}")
+    record_judge_stat('escalated')
+    return judge_with_model(old_content, new_content, prompt)
+
+# Pre-judge similarity method: 'ratio' (token-level difflib ratio), 'jaccard' (word shingles) or 'off'.
+# Off unless asked for, so every changed result still reaches the judge
+PREJUDGE_METHODS = ('ratio', 'jaccard', 'off')
+prejudge_method = 'off'
+prejudge_threshold = PREJUDGE_THRESHOLD
+
+def _normalize_json(text: str) -> Optional[str]:
+    """Canonical compact form of text if it is JSON, else None"""
+    try:
+        return json.dumps(json.loads(text), sort_keys=True, separators=(',', ':'))
+    except ValueError:
+        return None
+
+def normalize_output(text: str) -> str:
+    """
+    Reduce an output to the parts a reader would notice
     
-    return response_choice, f"Response Choice: {response_choice}\nExplanation: {explanation}\nComparison details appended to: {csv_path}"
+    JSON documents and fenced JSON blocks are re-serialised canonically, list
+    numbering and bullet styles are unified, and whitespace differences (indentation,
+    trailing spaces, blank lines, line endings) are dropped.
+    """
+    whole = _normalize_json(text)
+    if whole is not None:
+        return whole
+    text = re.sub(
+        r'```json\s*\n(.*?)```',
+        lambda match: f"```json\n{_normalize_json(match.group(1)) or match.group(1)}```",
+        text,
+        flags=re.DOTALL
+    )
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        line = re.sub(r'^(\d+[.)]|[-*+•])\s+', '- ', line)
+        lines.append(re.sub(r'\s+', ' ', line))
+    return '\n'.join(lines)
 
-def extract_prompt_from_json(example_json_path: Path) -> str:
+def _shingles(tokens: list[str], size: int = 3) -> set:
+    if len(tokens) < size:
+        return {tuple(tokens)}
+    return {tuple(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+def output_similarity(old_content: str, new_content: str, method: str = 'ratio') -> float:
     """
-    Extract and format the prompt from an example.json file
+    Similarity of two outputs in [0, 1] after normalize_output
     
     Args:
-        example_json_path: Path to the example.json file
-        
-    Returns:
-        str: A formatted prompt string combining system instructions and user request
+        old_content: The old response
+        new_content: The new response
+        method: 'ratio' for difflib's matching-token ratio, 'jaccard' for the Jaccard
+            index of word 3-shingles (faster on long outputs)
     """
-    prompt = "Compare these two outputs"  # Default prompt
+    old_normalized, new_normalized = normalize_output(old_content), normalize_output(new_content)
+    if old_normalized == new_normalized:
+        return 1.0
+    old_tokens, new_tokens = old_normalized.split(), new_normalized.split()
+    if method == 'jaccard':
+        old_shingles, new_shingles = _shingles(old_tokens), _shingles(new_tokens)
+        return len(old_shingles & new_shingles) / len(old_shingles | new_shingles)
+    return difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False).ratio()
+
+class ComparisonHistory:
+    """SQLite history of judge comparisons
     
-    if not example_json_path.exists():
-        return prompt
+    Response texts are stored once per content hash, so repeated comparisons of
+    the same outputs only add a small row. Indexed by example and time for queries
+    like the win rate of new results over the last 30 days.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS blobs (hash TEXT PRIMARY KEY, content TEXT NOT NULL)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS comparisons ("
+            "id INTEGER PRIMARY KEY, created_at REAL NOT NULL, example TEXT, "
+            "old_hash TEXT NOT NULL REFERENCES blobs (hash), new_hash TEXT NOT NULL REFERENCES blobs (hash), "
+            "response_choice TEXT NOT NULL, explanation TEXT NOT NULL, judge_model TEXT, latency_ms REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS comparisons_example ON comparisons (example, created_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS comparisons_judge_model ON comparisons (judge_model)")
+        self.conn.commit()
+    
+    def _store_blob(self, content: str) -> str:
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        self.conn.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?)", (digest, content))
+        return digest
+    
+    def _insert(self, created_at: float, example: Optional[str], old_content: str, new_content: str,
+                response_choice: str, explanation: str, judge_model: Optional[str], latency_ms: Optional[float]):
+        self.conn.execute(
+            "INSERT INTO comparisons (created_at, example, old_hash, new_hash, response_choice, "
+            "explanation, judge_model, latency_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (created_at, example, self._store_blob(old_content), self._store_blob(new_content),
+             response_choice, explanation, judge_model, latency_ms)
+        )
+    
+    def add(self, example: Optional[str], old_content: str, new_content: str, response_choice: str,
+            explanation: str, judge_model: Optional[str] = None, latency_ms: Optional[float] = None):
+        """Record one judged comparison"""
+        with self.lock:
+            self._insert(time.time(), example, old_content, new_content, response_choice,
+                         explanation, judge_model, latency_ms)
+            self.conn.commit()
+    
+    def migrate_csv(self, csv_path: Path) -> int:
+        """
+        Import the rows of a legacy comparisons.csv and rename it to *.csv.migrated
         
-    try:
-        with open(example_json_path, 'r') as f:
-            example_json = json.load(f)
+        The CSV did not record the example, judge model or latency; those stay NULL.
         
-        # Extract system prompt
-        system_text = ""
-        if "system" in example_json and example_json["system"]:
-            for system_item in example_json["system"]:
-                if "text" in system_item:
-                    system_text += system_item["text"] + "\n"
+        Returns:
+            int: Number of rows imported
+        """
+        csv.field_size_limit(sys.maxsize)
+        imported = 0
+        with open(csv_path, newline='') as f, self.lock:
+            reader = csv.reader(f)
+            next(reader, None)  # Header
+            for row in reader:
+                if len(row) < 5:
+                    continue
+                timestamp, old_content, new_content, response_choice, explanation = row[:5]
+                try:
+                    created_at = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S').timestamp()
+                except ValueError:
+                    created_at = csv_path.stat().st_mtime
+                self._insert(created_at, None, old_content, new_content, response_choice,
+                             explanation, None, None)
+                imported += 1
+            self.conn.commit()
+        csv_path.rename(csv_path.with_name(csv_path.name + '.migrated'))
+        return imported
+    
+    def win_rates(self, days: float = 30) -> list[tuple[str, int, int, float]]:
+        """(example, comparisons, new wins, new win rate) per example over the last days
         
-        # Extract user messages
-        user_text = ""
+        Only real verdicts count. Older runs recorded failed judge calls as old_response
+        wins, which are recognised by their explanation and left out.
+        """
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COALESCE(example, '(unknown)'), COUNT(*), "
+                "SUM(response_choice = 'new_response'), AVG(response_choice = 'new_response') "
+                "FROM comparisons WHERE created_at >= ? "
+                "AND response_choice IN ('new_response', 'old_response') "
+                "AND explanation NOT LIKE 'Error occurred during model evaluation%' "
+                "GROUP BY example ORDER BY example",
+                (time.time() - days * 86400,)
+            ).fetchall()
+    
+    def judge_latency(self) -> list[tuple[str, int, float, float, float]]:
+        """(judge model, calls, mean, min and max latency in ms) of model calls per judge model"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT judge_model, COUNT(*), AVG(latency_ms), MIN(latency_ms), MAX(latency_ms) "
+                "FROM comparisons WHERE judge_model IS NOT NULL AND latency_ms IS NOT NULL "
+                "GROUP BY judge_model ORDER BY judge_model"
+            ).fetchall()
+
+comparison_history: Optional[ComparisonHistory] = None
+_comparison_history_lock = threading.Lock()
+
+def get_comparison_history() -> ComparisonHistory:
+    """The shared comparison history, migrating a legacy comparisons.csv on first use"""
+    global comparison_history
+    with _comparison_history_lock:
+        if comparison_history is None:
+            comparison_history = ComparisonHistory(COMPARISONS_DIR / 'comparisons.sqlite')
+            csv_path = COMPARISONS_DIR / 'comparisons.csv'
+            if csv_path.exists():
+                imported = comparison_history.migrate_csv(csv_path)
+                logger_main.info(f"Migrated {imported} comparisons from {csv_path}")
+        return comparison_history
+
+def compare_results(prompt: str, old_results_path: Path, new_results_path: Path, example: Optional[str] = None) -> tuple[bool, str]:
+    """Compare two result files using LLM and return superior one and the comparison details"""
+    if not old_results_path.exists() or not new_results_path.exists():
+        return False, "One or both result files do not exist"
+    
+    with open(old_results_path) as old_file, open(new_results_path) as new_file:
+        old_content = old_file.read()
+        new_content = new_file.read()
+        
+    if old_content == new_content:
+        record_judge_stat('exact')
+        return True, "Results match exactly"
+    
+    # Near-identical outputs are not worth a judge round trip; keep the old one
+    if prejudge_method != 'off':
+        similarity = output_similarity(old_content, new_content, prejudge_method)
+        if similarity >= prejudge_threshold:
+            record_judge_stat('similar')
+            logger_main.info(f"Results are {similarity:.3f} similar ({prejudge_method}); keeping old result without judging")
+            return "old_response", f"Similarity {similarity:.3f} >= {prejudge_threshold}; kept old result without judging"
+    
+    # Use Claude to compare the results
+    _judge_call.model, _judge_call.latency_ms = None, None
+    response_choice, explanation = judge_pair(old_content, new_content, prompt)
+    if response_choice == JUDGE_ERROR:
+        # A failed judge call is not a comparison; nothing to record
+        return response_choice, f"Judge call failed: {explanation}"
+    
+    get_comparison_history().add(example, old_content, new_content, response_choice, explanation,
+                                 _judge_call.model, _judge_call.latency_ms)
+    
+    return response_choice, f"Response Choice: {response_choice}\nExplanation: {explanation}\nComparison recorded in: {comparison_history.path}"
+
+def example_bedrock_target(example_path: Path) -> tuple[str, str]:
+    """
+    Find the model ID and region an example.py calls, for rate limiting
+    
+    Args:
+        example_path: Path to the example.py file
+        
+    Returns:
+        tuple[str, str]: The model ID ('unknown' if not found) and the region
+    """
+    try:
+        source = example_path.read_text()
+    except OSError:
+        return 'unknown', EXAMPLE_REGION
+    model_match = re.search(r'modelId\s*=\s*[\'"]([^\'"]+)[\'"]', source)
+    region_match = re.search(r'region_name\s*=\s*[\'"]([^\'"]+)[\'"]', source)
+    return (
+        model_match.group(1) if model_match else 'unknown',
+        region_match.group(1) if region_match else EXAMPLE_REGION,
+    )
+
+def extract_prompt_from_json(example_json_path: Path) -> str:
+    """
+    Extract and format the prompt from an example.json file
+    
+    Args:
+        example_json_path: Path to the example.json file
+        
+    Returns:
+        str: A formatted prompt string combining system instructions and user request
+    """
+    prompt = "Compare these two outputs"  # Default prompt
+    
+    if not example_json_path.exists():
+        return prompt
+        
+    try:
+        with open(example_json_path, 'r') as f:
+            example_json = json.load(f)
+        
+        # Extract system prompt
+        system_text = ""
+        if "system" in example_json and example_json["system"]:
+            for system_item in example_json["system"]:
+                if "text" in system_item:
+                    system_text += system_item["text"] + "\n"
+        
+        # Extract user messages
+        user_text = ""
         if "messages" in example_json:
             for message in example_json["messages"]:
                 if message.get("role") == "user" and "content" in message:
@@ -256,200 +1231,2521 @@ def extract_prompt_from_json(example_json_path: Path) -> str:
         
     return prompt
 
-def run_single_example(example_dir: Path):
-    """Run a single example from the specified directory"""
-    example_path = example_dir / 'example.py'
-    example_json_path = example_dir / 'example.json'
+def _warm_worker_client_factory(original_client):
+    """Wrap boto3.client so example scripts in a warm worker use the shared client cache"""
+    def client(*args, **kwargs):
+        service_name = kwargs.get('service_name', args[0] if args else None)
+        # Only share default-configured clients; anything customised gets its own
+        if service_name != 'bedrock-runtime' or len(args) > 1 or set(kwargs) - {'service_name', 'region_name'}:
+            client = original_client(*args, **kwargs)
+            if service_name == 'bedrock-runtime':
+                install_replay_hooks(client)
+                install_timing_hooks(client)
+            return client
+        return get_bedrock_client(kwargs.get('region_name'))
     
-    # Create results directory if it doesn't exist
-    RESULTS_DIR.mkdir(exist_ok=True)
+    return client
+
+@contextlib.contextmanager
+def example_workdir(example_path: Path):
+    """
+    A scratch working directory for one run of an example.py
     
-    # Generate timestamped results filename
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    results_filename = f"{example_dir.name}_{timestamp}.md"
-    new_results_path = RESULTS_DIR / results_filename
+    The example's side inputs are copied into it, so scripts that open them by bare
+    name (e.g. image_manipulation) find them, and whatever the script writes lands
+    there and is discarded instead of overwriting files under docs/prompts. (Links
+    would not do: writing to a link writes through to the tracked file.)
+    """
+    with tempfile.TemporaryDirectory(prefix='nova-example-') as workdir:
+        for path in Path(example_path).parent.iterdir():
+            if path.is_file() and path.name not in EXAMPLE_OWN_FILES:
+                shutil.copyfile(path, os.path.join(workdir, path.name))
+        yield workdir
+
+def _warm_worker_main(conn, settings: dict):
+    """Entry point of a warm interpreter: import boto3 once, then run example.py files on request"""
+    global replay_mode, REPLAY_DIR, _call_timings
+    replay_mode = settings['replay_mode']
+    # Absolute, as examples run with a scratch directory as their working directory
+    REPLAY_DIR = Path(settings['replay_dir'])
+    import boto3
+    boto3.client = _warm_worker_client_factory(boto3.client)
+    # Build the shared client up front so the service model is loaded before the first example
+    get_bedrock_client(EXAMPLE_REGION)
     
-    # Find previous result file for this example if it exists
-    previous_results = sorted(
-        RESULTS_DIR.glob(f"{example_dir.name}_*.md"),
-        key=lambda x: x.stat().st_mtime,
-        reverse=True
-    )
-    previous_result_path = previous_results[0] if previous_results else None
+    while True:
+        try:
+            example_path = conn.recv()
+        except EOFError:
+            return
+        if example_path is None:
+            return
+        
+        stdout, stderr = io.StringIO(), io.StringIO()
+        returncode = 0
+        _call_timings = []
+        saved_argv, saved_cwd = sys.argv, os.getcwd()
+        sys.argv = [example_path]
+        try:
+            with example_workdir(example_path) as workdir:
+                os.chdir(workdir)
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                    runpy.run_path(example_path, run_name='__main__')
+        except SystemExit as e:
+            returncode = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            stderr.write(traceback.format_exc())
+            returncode = 1
+        finally:
+            os.chdir(saved_cwd)
+            sys.argv = saved_argv
+        conn.send((returncode, stdout.getvalue(), stderr.getvalue(), _call_timings))
+
+class _WarmWorker:
+    """A single pre-warmed interpreter process and the pipe used to talk to it"""
+    def __init__(self, ctx, settings: dict):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_warm_worker_main, args=(child_conn, settings), daemon=True)
+        self.process.start()
+        child_conn.close()
     
-    if not example_path.exists():
-        logger_main.info(f"Error: No example.py found in {example_dir}")
-        return
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+class WarmInterpreterPool:
+    """Pool of long-lived interpreters that run example.py files in-process via runpy
     
-    # Validate example_path to ensure it's safe to execute
-    try:
-        # Resolve to absolute path to avoid directory traversal
-        example_path = example_path.resolve(strict=True)
-        # Check that it's within the expected directory structure
-        if not str(example_path).startswith(str(Path('docs/prompts').resolve())):
-            logger_main.info(f"Error: Example path {example_path} is outside the allowed directory")
-            return
-    except (RuntimeError, ValueError) as e:
-        logger_main.error(f"Error: Invalid example path {example_path}: {str(e)}")
-        return
+    Workers come from a forkserver that has already imported boto3, and each worker
+    builds its bedrock-runtime client once, so interpreter startup and client setup
+    are paid once per worker instead of once per example. Each example still gets a
+    fresh module namespace and its own captured stdout/stderr. A worker that exceeds
+    the timeout is killed and replaced, leaving the other workers untouched.
+    """
+    def __init__(self, workers: int = 1):
+        self.logger = logging.getLogger('WarmInterpreterPool')
+        self._ctx = multiprocessing.get_context('forkserver')
+        self._ctx.set_forkserver_preload(['__main__', 'boto3'])
+        # Module settings the workers need; they import this file afresh, so pass them explicitly
+        self._settings = {'replay_mode': replay_mode, 'replay_dir': str(REPLAY_DIR.resolve())}
+        self._idle: queue.Queue[_WarmWorker] = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(_WarmWorker(self._ctx, self._settings))
+        self._size = workers
+        self.logger.info(f"Started {workers} warm interpreter(s)")
+    
+    def run(self, example_path: Path, timeout: float = EXAMPLE_TIMEOUT) -> subprocess.CompletedProcess:
+        """Run example_path in an idle worker, with the same contract as subprocess.run
+        
+        Raises:
+            subprocess.TimeoutExpired: If the example does not finish within timeout seconds
+        """
+        worker = self._idle.get()
+        try:
+            worker.conn.send(str(example_path))
+            if not worker.conn.poll(timeout):
+                self.logger.error(f"{example_path} exceeded {timeout}s, replacing its worker")
+                worker.kill()
+                worker = _WarmWorker(self._ctx, self._settings)
+                raise subprocess.TimeoutExpired([str(example_path)], timeout)
+            returncode, stdout, stderr, call_timings = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            # The worker died (e.g. the example called os._exit); start a fresh one
+            self.logger.error(f"Warm worker failed while running {example_path}: {str(e)}")
+            worker.kill()
+            worker = _WarmWorker(self._ctx, self._settings)
+            returncode, stdout, stderr, call_timings = 1, "", f"Warm worker failed: {str(e)}\n", []
+        finally:
+            self._idle.put(worker)
+        result = subprocess.CompletedProcess([str(example_path)], returncode, stdout, stderr)
+        # Timings of the Bedrock calls the example made (see install_timing_hooks)
+        result.call_timings = call_timings
+        return result
+    
+    def close(self):
+        """Stop every worker in the pool"""
+        for _ in range(self._size):
+            worker = self._idle.get()
+            try:
+                worker.conn.send(None)
+                worker.process.join(timeout=5)
+            except (BrokenPipeError, OSError):
+                pass
+            if worker.process.is_alive():
+                worker.kill()
+
+# Pool used by execute_example when examples run in warm interpreters (see run_examples)
+warm_pool: Optional[WarmInterpreterPool] = None
+
+def execute_example(example_path: Path, timeout: float = EXAMPLE_TIMEOUT) -> subprocess.CompletedProcess:
+    """Run an example.py and capture its output, in a warm interpreter if a pool is active
     
-    # Extract the prompt from example.json
-    prompt = extract_prompt_from_json(example_json_path)
+    Results from warm interpreters also carry call_timings for each Bedrock call.
     
-    logger_main.info(f"\nTesting: {example_path}")
-    try:
-        bedrock_rate_limiter.wait()
-        # Run the example.py file and capture output
+    Raises:
+        subprocess.TimeoutExpired: If the example runs longer than timeout seconds
+    """
+    if warm_pool is not None:
+        return warm_pool.run(example_path, timeout=timeout)
+    with example_workdir(example_path) as workdir:
         # Using a list of arguments is already safe against command injection when shell=False
-        result = subprocess.run(
-            [sys.executable, str(example_path)],  # Use full path to Python executable
+        return subprocess.run(
+            [sys.executable, str(Path(example_path).resolve())],  # Use full path to Python executable
             capture_output=True,
             text=True,
-            timeout=30,  # Set a timeout of 30 seconds
+            timeout=timeout,
+            cwd=workdir,
             shell=False  # Explicitly set shell=False for additional security
         )
+
+class ExecutionHistory:
+    """SQLite history of example.py runs: how long each took and how it ended
+    
+    Timed-out runs are recorded with their budget as the duration, a lower bound
+    on how long the example needed, so repeated timeouts push its budget up.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS executions ("
+            "id INTEGER PRIMARY KEY, started_at REAL NOT NULL, example TEXT NOT NULL, "
+            "status TEXT NOT NULL, duration REAL NOT NULL, timeout REAL NOT NULL, attempt INTEGER NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS executions_example ON executions (example, started_at)")
+        self.conn.commit()
+    
+    def add(self, example: str, status: str, duration: float, timeout: float, attempt: int = 1):
+        """Record one run; status is 'ok', 'timeout', 'throttled' or 'error'"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO executions (started_at, example, status, duration, timeout, attempt) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (time.time() - duration, example, status, duration, timeout, attempt)
+            )
+            self.conn.commit()
+    
+    def durations(self, example: str, limit: int = EXAMPLE_TIMEOUT_HISTORY) -> list[float]:
+        """Seconds the example's most recent completed or timed-out runs took, newest first"""
+        with self.lock:
+            return [row[0] for row in self.conn.execute(
+                "SELECT duration FROM executions WHERE example = ? AND status IN ('ok', 'timeout') "
+                "ORDER BY started_at DESC LIMIT ?", (example, limit))]
+    
+    def summary(self, days: float = 30) -> list[tuple[str, int, int, int]]:
+        """(example, runs, timeouts, other failures) per example over the last days"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT example, COUNT(*), SUM(status = 'timeout'), SUM(status IN ('throttled', 'error')) "
+                "FROM executions WHERE started_at >= ? GROUP BY example ORDER BY example",
+                (time.time() - days * 86400,)
+            ).fetchall()
+
+execution_history: Optional[ExecutionHistory] = None
+_execution_history_lock = threading.Lock()
+
+def get_execution_history() -> ExecutionHistory:
+    """The shared history of example.py runs"""
+    global execution_history
+    with _execution_history_lock:
+        if execution_history is None:
+            execution_history = ExecutionHistory(CACHE_DIR / 'executions.sqlite')
+        return execution_history
+
+def example_timeout(example_dir: Path) -> float:
+    """
+    Seconds an example.py may run before it is abandoned
+    
+    A "timeout" in the example's .meta.yaml (or its category's) wins; see example_meta
+    for the format. Otherwise the budget is EXAMPLE_TIMEOUT_MARGIN times the p99 of its
+    recent run times, kept between EXAMPLE_TIMEOUT and EXAMPLE_TIMEOUT_MAX;
+    EXAMPLE_TIMEOUT until it has run.
+    """
+    record = get_example_registry().get(example_dir)
+    if record is not None and record.timeout is not None:
+        return record.timeout
+    durations = get_execution_history().durations(InputManifest.example_id(example_dir))
+    if not durations:
+        return EXAMPLE_TIMEOUT
+    return min(EXAMPLE_TIMEOUT_MAX, max(EXAMPLE_TIMEOUT, percentile(durations, 99) * EXAMPLE_TIMEOUT_MARGIN))
+
+def execute_with_retries(example_dir: Path, example_path: Path, rate_keys: tuple) -> subprocess.CompletedProcess:
+    """
+    Run an example.py within its timeout budget, retrying timeouts and transient failures
+    
+    Up to EXAMPLE_MAX_ATTEMPTS runs are made, with full-jitter exponential backoff
+    between them; a run that timed out doubles the budget of the next one (up to
+    EXAMPLE_TIMEOUT_MAX). Every run is recorded in the execution history and fed to
+    the rate limiter.
+    
+    Returns:
+        subprocess.CompletedProcess: The last run
+        
+    Raises:
+        subprocess.TimeoutExpired: If the last run timed out
+    """
+    example_id = InputManifest.example_id(example_dir)
+    history = get_execution_history()
+    timeout = example_timeout(example_dir)
+    for attempt in range(1, EXAMPLE_MAX_ATTEMPTS + 1):
+        if attempt > 1:
+            # Full jitter so that retries of throttled examples spread out; not security related
+            backoff = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+            delay = random.uniform(0, backoff)  # nosec B311
+            logger_main.info(f"Retrying {example_dir.name} in {delay:.1f}s (attempt {attempt} of {EXAMPLE_MAX_ATTEMPTS})")
+            time.sleep(delay)
+            if replay_mode != 'replay':
+                bedrock_rate_limiter.wait(*rate_keys)
         
-        # Parse the stdout into a dictionary
+        started = time.monotonic()
         try:
-            # Extract the dictionary string from stdout
-            stdout_content = result.stdout.strip()
-            if not stdout_content:
-                output = "output not available"
-            else:
-                # Convert the string representation of dict to actual dict
-                response_dict = json.loads(stdout_content)
-                
-                # Extract message content
-                if (isinstance(response_dict, dict) and
-                    'output' in response_dict and
-                    isinstance(response_dict['output'], dict) and
-                    'message' in response_dict['output'] and
-                    'content' in response_dict['output']['message']):
-                    
-                    content = response_dict['output']['message']['content']
-                    if isinstance(content, list):
-                        # Combine all text content from the array
-                        output = '\n'.join(item.get('text', '') for item in content if isinstance(item, dict) and 'text' in item)
-                    else:
-                        output = str(content)
-                else:
-                    output = stdout_content
-        except json.JSONDecodeError as e:
-            output = result.stdout if result.stdout else f"JSON decoding error: {str(e)}"
-        except Exception as e:
-            output = f"Error parsing output: {str(e)}\n{result.stdout if result.stdout else 'output not available'}"
+            result = execute_example(example_path, timeout)
+        except subprocess.TimeoutExpired:
+            history.add(example_id, 'timeout', timeout, timeout, attempt)
+            logger_main.error(f"{example_dir.name} timed out after {timeout:.0f}s")
+            if attempt == EXAMPLE_MAX_ATTEMPTS:
+                raise
+            timeout = max(timeout, min(EXAMPLE_TIMEOUT_MAX, timeout * 2))
+            continue
+        duration = time.monotonic() - started
+        
+        # Feed the outcome back so the limiter can adapt to this model's quota
+        if result.returncode == 0:
+            bedrock_rate_limiter.record_success(*rate_keys)
+            history.add(example_id, 'ok', duration, timeout, attempt)
+            return result
+        throttled = is_throttled_output(result.stderr)
+        if throttled:
+            bedrock_rate_limiter.record_throttle(*rate_keys)
+        history.add(example_id, 'throttled' if throttled else 'error', duration, timeout, attempt)
+        if not is_transient_output(result.stderr) or attempt == EXAMPLE_MAX_ATTEMPTS:
+            return result
+        last_line = result.stderr.strip().splitlines()[-1]
+        logger_main.info(f"{example_dir.name} failed with a transient error: {last_line}")
+    return result
 
-        # Write the extracted content to results file
-        with open(new_results_path, 'w') as f:
-            f.write(output)
-            
-        logger_main.info(f"Results saved to: {new_results_path}")
-        
-        # Compare with previous results if they exist
-        if previous_result_path:
-            response_choice, comparison_result = compare_results(prompt, previous_result_path, new_results_path)
-            if response_choice == "new_response":
-                if update_example_md(example_dir, new_results_path):
-                    # If update was successful, delete the old results file
-                    try:
-                        previous_result_path.unlink()
-                        logger_main.info(f"Deleted old results file: {previous_result_path}")
-                    except Exception as e:
-                        logger_main.error(f"Warning: Could not delete old results file: {str(e)}")
-            else:
-                # If old file still reigns, delete the new one.
-                try:
-                    new_results_path.unlink()
-                    logger_main.info(f"Deleted new results file: {new_results_path}")
-                except Exception as e:
-                    logger_main.error(f"Warning: Could not delete new results file: {str(e)}")
+def response_text(response_dict) -> Optional[str]:
+    """The text content blocks of a Converse response joined by newlines, or None if it is not one"""
+    # Extract message content
+    if (isinstance(response_dict, dict) and
+        'output' in response_dict and
+        isinstance(response_dict['output'], dict) and
+        'message' in response_dict['output'] and
+        'content' in response_dict['output']['message']):
+        
+        content = response_dict['output']['message']['content']
+        if isinstance(content, list):
+            # Combine all text content from the array
+            return '\n'.join(item.get('text', '') for item in content if isinstance(item, dict) and 'text' in item)
+        return str(content)
+    return None
 
+def extract_output(stdout: str) -> str:
+    """
+    Extract the markdown the judge and docs see from an example's printed response
+    
+    Args:
+        stdout: What example.py printed, normally json.dumps of a Converse response
         
-    except subprocess.TimeoutExpired:
-        error_msg = f"Error: Script execution timed out after 30 seconds\n"
-        with open(new_results_path, 'w') as f:
-            f.write(error_msg)
-        logger_main.error(f"Timeout error saved to: {new_results_path}")
+    Returns:
+        str: The text content blocks joined by newlines, or the raw output if it is
+            not a Converse response
+    """
+    # Parse the stdout into a dictionary
+    try:
+        # Extract the dictionary string from stdout
+        stdout_content = stdout.strip()
+        if not stdout_content:
+            return "output not available"
+        # Convert the string representation of dict to actual dict
+        response_dict = json.loads(stdout_content)
         
+        text = response_text(response_dict)
+        return text if text is not None else stdout_content
+    except json.JSONDecodeError as e:
+        return stdout if stdout else f"JSON decoding error: {str(e)}"
     except Exception as e:
-        error_msg = f"Error executing script: {str(e)}\n"
-        with open(new_results_path, 'w') as f:
-            f.write(error_msg)
-        logger_main.error(f"Error saved to: {new_results_path}")
+        return f"Error parsing output: {str(e)}\n{stdout if stdout else 'output not available'}"
 
-def update_example_md(example_dir: Path, results_path: Path) -> bool:
+def load_converse_request(example_dir: Path) -> Optional[dict]:
     """
-    Update the example.md file in the example directory to point to the new results file.
+    Load example.json as keyword arguments for converse/converse_stream
+    
+    The model ID is taken from example.py when example.json omits it, and a plain
+    string system prompt is wrapped in the list form Converse expects.
     
     Args:
         example_dir: Path to the example directory
-        results_path: Path to the new results file
+        
+    Returns:
+        Optional[dict]: The request, or None if example.json is missing, invalid or
+            not a Converse request (e.g. Nova Canvas InvokeModel bodies)
+    """
+    try:
+        with open(example_dir / 'example.json') as f:
+            request = json.load(f)
+    except (OSError, ValueError) as e:
+        logger_main.info(f"No usable example.json in {example_dir}: {str(e)}")
+        return None
+    if not isinstance(request, dict) or 'messages' not in request:
+        return None
+    if 'modelId' not in request:
+        model_id, _ = example_bedrock_target(example_dir / 'example.py')
+        if model_id == 'unknown':
+            return None
+        request['modelId'] = model_id
+    if isinstance(request.get('system'), str):
+        request['system'] = [{'text': request['system']}]
+    return request
+
+def streaming_request(example_dir: Path) -> Optional[dict]:
+    """
+    The request to stream for an example, or None if it should run its example.py
+    
+    The request is the one example.py sends, captured without sending it (see
+    capture_example_request), so example.json need not match it. Converse examples
+    marked "prints_response: true" in .meta.yaml qualify, since their result is the
+    text blocks of the response, which stream_converse writes in the same way
+    (other blocks, such as tool use, are left out of both).
+    """
+    # Streams bypass the record/replay hooks, so replay modes keep to the normal executors
+    if not stream_mode or replay_mode != 'off':
+        return None
+    record = get_example_registry().get(example_dir)
+    if record is None or record.api != 'converse' or not record.prints_response:
+        return None
+    captured = capture_example_request(example_dir / 'example.py')
+    if captured.get('operation') != 'Converse':
+        logger_main.info(f"Running example.py for {example_dir.name}: its request cannot be streamed")
+        return None
+    return captured['params']
+
+# Send example.json requests from this process instead of running example.py (--executor json)
+json_executor = False
+
+class _RequestCaptured(BaseException):
+    """Raised from a before-call hook to stop an example script once its request is captured"""
+
+_capture_lock = threading.Lock()
+_capture_clients: dict[str, object] = {}
+_capture_state: dict = {}  # What the capture in progress has seen
+
+def _capture_record(params, model, **kwargs):
+    if 'operation' not in _capture_state:
+        _capture_state['operation'], _capture_state['params'] = model.name, copy.deepcopy(params)
+
+def _capture_stop(**kwargs):
+    raise _RequestCaptured()
+
+def _capture_client(*args, **kwargs):
+    """Stand-in for boto3.client while capturing: a client that never sends anything"""
+    region = kwargs.get('region_name') or EXAMPLE_REGION
+    if region not in _capture_clients:
+        # Requests are never sent, so they are not signed and need no credentials
+        capture_client = boto3.session.Session().client('bedrock-runtime', region_name=region,
+                                                        config=Config(signature_version=UNSIGNED))
+        capture_client.meta.events.register('before-parameter-build.bedrock-runtime', _capture_record)
+        capture_client.meta.events.register('before-call.bedrock-runtime', _capture_stop)
+        _capture_clients[region] = capture_client
+    _capture_state['region'] = region
+    return _capture_clients[region]
+
+def _example_open(example_dir: Path):
+    """open() for a captured script: bare-name reads of its side inputs resolve to example_dir
+    
+    Captures run in this process, so they cannot change directory like example_workdir.
+    """
+    def example_open(file, mode='r', *args, **kwargs):
+        if (isinstance(file, str) and not os.path.isabs(file) and not set(mode) & set('wax+')
+                and (example_dir / file).is_file()):
+            file = example_dir / file
+        return open(file, mode, *args, **kwargs)
+    return example_open
+
+def capture_example_request(example_path: Path) -> dict:
+    """
+    Run an example.py in-process and capture the first Bedrock request it makes, without sending it
+    
+    The script's boto3 clients are swapped for ones whose before-parameter-build hook
+    records the API parameters and whose before-call hook (after botocore has
+    validated and serialized them) stops the script.
     
+    Args:
+        example_path: Path to the example.py file
+        
     Returns:
-        bool: True if the file was updated successfully, False otherwise
+        dict: 'operation' (e.g. 'Converse'), 'params' and 'region' of the request,
+            and 'error' if the script failed before or while making it
     """
-    example_md_path = example_dir / 'example.md'
+    # boto3.client and stdout are process-wide, so captures run one at a time
+    with _capture_lock:
+        _capture_state.clear()
+        original_client = boto3.client
+        boto3.client = _capture_client
+        try:
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                runpy.run_path(str(example_path), run_name='__main__',
+                               init_globals={'open': _example_open(example_path.parent)})
+        except _RequestCaptured:
+            pass
+        except BaseException as e:
+            _capture_state['error'] = f"{type(e).__name__}: {str(e)}"
+        finally:
+            boto3.client = original_client
+        captured = dict(_capture_state)
+    if 'operation' not in captured and 'error' not in captured:
+        captured['error'] = "example.py made no Bedrock request"
+    return captured
+
+def json_example_request(example_dir: Path) -> Optional[tuple[str, dict]]:
+    """
+    The request example.json describes, as (operation, params) for the bedrock-runtime client
     
-    # Check if example.md exists
-    if not example_md_path.exists():
-        logger_main.info(f"Warning: No example.md found in {example_dir}")
-        return False
+    Converse examples use example.json as the call's keyword arguments; InvokeModel
+    examples use it as the body, with the model ID taken from example.py.
     
+    Returns:
+        Optional[tuple[str, dict]]: The request, or None if example.json is unusable
+    """
+    record = get_example_registry().get(example_dir)
+    if record is None or record.api == 'unknown':
+        return None
+    if record.api == 'converse':
+        request = load_converse_request(example_dir)
+        return ('Converse', request) if request is not None else None
     try:
-        # Read the content of the example.md file
-        with open(example_md_path, 'r') as f:
-            content = f.read()
-        
-        # Find the line that contains --8<-- and points to a results file with timestamp
-        pattern = r'--8<-- "([^"]+\.md)"'
-        matches = re.findall(pattern, content)
-        
-        if not matches:
-            logger_main.info(f"Warning: No results.md reference found in {example_md_path}")
-            return False
-        
-        # Get the relative path of the new results file
-        # We need to convert the absolute path to a relative path from the project root
-        relative_results_path = str(results_path)
-        
-        # Update each occurrence that matches the pattern
-        updated_content = content
-        for match in matches:
-            updated_content = updated_content.replace(f'--8<-- "{match}"', f'--8<-- "{relative_results_path}"')
-        
-        # Write the updated content back to the file
-        with open(example_md_path, 'w') as f:
-            f.write(updated_content)
+        with open(example_dir / 'example.json') as f:
+            body = json.load(f)
+    except (OSError, ValueError) as e:
+        logger_main.info(f"No usable example.json in {example_dir}: {str(e)}")
+        return None
+    return 'InvokeModel', {'modelId': record.model_id, 'body': json.dumps(body),
+                           'accept': 'application/json', 'contentType': 'application/json'}
+
+def canonical_request(operation: str, params: dict) -> dict:
+    """The parts of a request that decide what the model sees, in a comparable form
+    
+    InvokeModel bodies are decoded from JSON; accept and contentType are dropped.
+    """
+    if operation != 'InvokeModel':
+        return params
+    body = params.get('body')
+    try:
+        body = json.loads(body) if isinstance(body, (str, bytes)) else body
+    except ValueError:
+        pass
+    return {'modelId': params.get('modelId'), 'body': body}
+
+def request_differences(expected, actual, path: str = '') -> list[str]:
+    """Human-readable differences between two canonical requests"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        differences = []
+        for key in sorted(set(expected) | set(actual), key=str):
+            if key not in actual:
+                differences.append(f"{path}/{key}: missing")
+            elif key not in expected:
+                differences.append(f"{path}/{key}: unexpected")
+            else:
+                differences.extend(request_differences(expected[key], actual[key], f"{path}/{key}"))
+        return differences
+    if isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        return [difference for i, (e, a) in enumerate(zip(expected, actual))
+                for difference in request_differences(e, a, f"{path}[{i}]")]
+    if expected != actual:
+        return [f"{path or '/'}: expected {_trim_middle(repr(expected), 80)}, got {_trim_middle(repr(actual), 80)}"]
+    return []
+
+SH_OPERATIONS = {'converse': 'Converse', 'invoke-model': 'InvokeModel'}
+SH_GLOBAL_OPTIONS = {'--cli-binary-format', '--output', '--profile', '--endpoint-url'}
+SH_TEXT_PARAMS = {'modelId', 'body', 'accept', 'contentType'}  # Passed as-is rather than decoded from JSON
+
+def parse_example_sh(example_dir: Path) -> dict:
+    """
+    Parse the aws bedrock-runtime command in example.sh into the request it sends
+    
+    Options become the API parameters boto3 would take (--inference-config becomes
+    inferenceConfig, and so on), with JSON values decoded. A value that is not
+    valid JSON is kept as the raw string, so it shows up as a difference.
+    
+    Returns:
+        dict: 'operation', 'params' and 'region', like capture_example_request, or
+            'error' if the script does not hold a usable command
+    """
+    try:
+        text = (example_dir / 'example.sh').read_text()
+        # Line continuations are removed before splitting, as the shell does
+        words = shlex.split(text.replace('\\\n', ''))
+    except (OSError, ValueError) as e:
+        return {'error': f"example.sh: {str(e)}"}
+    if words[:2] != ['aws', 'bedrock-runtime'] or len(words) < 3 or words[2] not in SH_OPERATIONS:
+        return {'error': "example.sh does not run an aws bedrock-runtime converse or invoke-model command"}
+    
+    params, region = {}, None
+    arguments = iter(words[3:])
+    for option in arguments:
+        if not option.startswith('--'):
+            continue  # invoke-model's output file
+        value = next(arguments, None)
+        if value is None:
+            return {'error': f"example.sh: {option} has no value"}
+        if option == '--region':
+            region = value
+            continue
+        if option in SH_GLOBAL_OPTIONS:
+            continue
+        first, *rest = option[2:].split('-')
+        key = first + ''.join(part.capitalize() for part in rest)
+        if key not in SH_TEXT_PARAMS:
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        params[key] = value
+    return {'operation': SH_OPERATIONS[words[2]], 'params': params, 'region': region}
+
+def request_mismatches(captured: dict, operation: str, params: dict, region: Optional[str] = None) -> list[str]:
+    """Differences between the request example.py made (see capture_example_request) and another description of it"""
+    if captured['operation'] != operation:
+        return [f"example.py calls {captured['operation']}, not {operation}"]
+    differences = request_differences(canonical_request(captured['operation'], captured['params']),
+                                      canonical_request(operation, params))
+    if region is not None and captured['region'] != region:
+        differences.append(f"region: expected {captured['region']}, got {region}")
+    return differences
+
+def request_conformance(example_dir: Path) -> list[str]:
+    """
+    Check that the request built from example.json is the one example.py sends
+    
+    Returns:
+        list[str]: The differences found; empty if the two requests are identical
+    """
+    request = json_example_request(example_dir)
+    if request is None:
+        return ["example.json does not describe a usable request"]
+    captured = capture_example_request(example_dir / 'example.py')
+    if 'error' in captured:
+        return [f"example.py: {captured['error']}"]
+    record = get_example_registry().get(example_dir)
+    return request_mismatches(captured, *request, record.region if record is not None else None)
+
+def conformance_check(example_dir: Path) -> dict:
+    """
+    Compare the requests example.json and example.sh describe with the one example.py sends
+    
+    Returns:
+        dict: 'example' (its ID), and 'error' if example.py made no request, or else the
+            differences found for 'json' and 'sh' (None for 'sh' if there is no example.sh)
+    """
+    report = {'example': InputManifest.example_id(example_dir)}
+    captured = capture_example_request(example_dir / 'example.py')
+    if 'error' in captured:
+        report['error'] = captured['error']
+        return report
+    request = json_example_request(example_dir)
+    report['json'] = (request_mismatches(captured, *request) if request is not None
+                      else ["example.json does not describe a usable request"])
+    report['sh'] = None
+    if (example_dir / 'example.sh').exists():
+        parsed = parse_example_sh(example_dir)
+        report['sh'] = ([parsed['error']] if 'error' in parsed
+                        else request_mismatches(captured, parsed['operation'], parsed['params'], parsed['region']))
+    return report
+
+# Differences request_conformance found, keyed by example ID and input hash
+_conformance_results: dict[tuple[str, str], list[str]] = {}
+_conformance_lock = threading.Lock()
+
+def example_conforms(example_dir: Path) -> bool:
+    """
+    Whether example.json describes exactly the request example.py sends
+    
+    Checked once per version of the example's inputs; differences are logged the
+    first time.
+    """
+    key = (InputManifest.example_id(example_dir), example_input_hash(example_dir))
+    with _conformance_lock:
+        if key not in _conformance_results:
+            _conformance_results[key] = request_conformance(example_dir)
+            for difference in _conformance_results[key]:
+                logger_main.info(f"{example_dir.name}: example.json does not match example.py: {difference}")
+        return not _conformance_results[key]
+
+def example_json_usable(example_dir: Path) -> bool:
+    """
+    Whether example.json may stand in for running example.py
+    
+    Only examples marked "prints_response: true" in .meta.yaml qualify (their output
+    is the printed response, whereas other scripts post-process it, e.g. saving
+    generated images), and only if their example.json conforms to what example.py
+    sends, so a result always comes from the code the page shows.
+    """
+    record = get_example_registry().get(example_dir)
+    return record is not None and record.prints_response and example_conforms(example_dir)
+
+def direct_request(example_dir: Path) -> Optional[tuple[str, dict]]:
+    """The request the JSON executor sends for an example, or None if example.py must run"""
+    if not json_executor:
+        return None
+    if not example_json_usable(example_dir):
+        logger_main.info(f"Running example.py for {example_dir.name} instead of sending example.json")
+        return None
+    return json_example_request(example_dir)
+
+def send_example_request(operation: str, params: dict, region: Optional[str] = None) -> dict:
+    """Send a request from json_example_request through the shared client and return the response"""
+    client = get_bedrock_client(region)
+    if operation == 'Converse':
+        return client.converse(**params)
+    response = client.invoke_model(**params)
+    return json.loads(response['body'].read())
+
+def stream_converse(request: dict, region: Optional[str] = None, results_path: Optional[Path] = None) -> dict:
+    """
+    Send a Converse request through converse_stream and collect the output
+    
+    Text is appended to a hidden .partial file next to results_path as each delta
+    arrives, and renamed to results_path once the stream completes, producing the
+    same markdown extract_output would build from the blocking response. Only the
+    timings are kept in memory, however long the output.
+    
+    Args:
+        request: Keyword arguments for converse_stream (see load_converse_request)
+        region: Region to call
+        results_path: File to stream text into, if any
         
-        logger_main.info(f"Updated {example_md_path} to point to {relative_results_path}")
-        return True
+    Returns:
+        dict: 'ttft_ms' (time to first text token), 'inter_token_ms' (gaps between
+            text deltas), 'usage' and 'latency_ms'
+    """
+    client = get_bedrock_client(region)
+    started = time.perf_counter()
+    response = client.converse_stream(**request)
     
-    except Exception as e:
-        logger_main.error(f"Error updating example.md: {str(e)}")
-        return False
+    text_blocks = set()
+    first_token_at = last_token_at = None
+    inter_token_ms = []
+    usage, latency_ms = {}, None
+    partial_path = results_path.with_name(f".{results_path.name}.partial") if results_path else None
+    sink = open(partial_path, 'w') if results_path else None
+    completed = False
+    try:
+        for event in response['stream']:
+            if 'contentBlockDelta' in event:
+                delta = event['contentBlockDelta']['delta']
+                if 'text' not in delta:
+                    continue
+                now = time.perf_counter()
+                if first_token_at is None:
+                    first_token_at = now
+                else:
+                    inter_token_ms.append((now - last_token_at) * 1000)
+                last_token_at = now
+                
+                # Text blocks are separated by a newline, as in extract_output
+                piece = delta['text']
+                block = event['contentBlockDelta']['contentBlockIndex']
+                if block not in text_blocks:
+                    if text_blocks:
+                        piece = '\n' + piece
+                    text_blocks.add(block)
+                if sink:
+                    sink.write(piece)
+                    sink.flush()
+            elif 'metadata' in event:
+                usage = event['metadata'].get('usage', {})
+                latency_ms = event['metadata'].get('metrics', {}).get('latencyMs')
+        completed = True
+    finally:
+        if sink:
+            sink.close()
+            if completed:
+                os.replace(partial_path, results_path)
+            else:
+                partial_path.unlink()
+    
+    return {
+        'ttft_ms': (first_token_at - started) * 1000 if first_token_at else None,
+        'inter_token_ms': inter_token_ms,
+        'usage': usage,
+        'latency_ms': latency_ms,
+    }
 
-def run_examples(example_name: str = None):
-    """Run examples, either all or a specific one based on the example_name"""
-    # Get the absolute path to docs/prompts directory
-    prompts_dir = Path('docs/prompts')
+@dataclass
+class ExampleJob:
+    """An example moving through the execute -> extract -> judge -> publish stages"""
+    example_dir: Path
+    started: float = 0.0
+    example_path: Optional[Path] = None
+    prompt: str = ""
+    new_results_path: Optional[Path] = None
+    previous_result_path: Optional[Path] = None
+    returncode: Optional[int] = None
+    stdout: Optional[str] = None  # Output of example.py; None if the result was streamed to disk
+    response: Optional[dict] = None  # Response object, when the JSON executor sent the request
+    response_choice: Optional[str] = None
+    usage: Optional[dict] = None  # Token usage of the run, when the response reports it
+    outcome: Optional[ExampleOutcome] = None  # Set once the job is finished, possibly early
+    log_records: Optional[list] = None  # Buffered log records when run in the pipeline
+    completed: tuple = ()  # Names of stages already done in an earlier, interrupted run
     
-    if example_name:
-        # Find the example directory
-        for root, dirs, files in os.walk(prompts_dir):
-            if Path(root).name == example_name:
-                run_single_example(Path(root))
-                return
-        logger_main.error(f"Error: Example directory '{example_name}' not found")
-        return
+    @property
+    def name(self) -> str:
+        return self.example_dir.name
     
-    # If no specific example, walk through all directories recursively
-    for root, dirs, files in os.walk(prompts_dir):
-        if 'example.py' in files:
-            run_single_example(Path(root))
+    def finish(self, status: str, detail: str = "") -> ExampleOutcome:
+        self.outcome = ExampleOutcome(self.name, status, detail=detail, returncode=self.returncode)
+        return self.outcome
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Run Nova prompt examples')
-    parser.add_argument('example', nargs='?', help='Name of the example directory to run (e.g., "function_generator"). If not provided, runs all examples.')
-    args = parser.parse_args()
+def prepare_result_paths(job: ExampleJob):
+    """Choose the job's new results file and find the result it will be compared with"""
+    example_dir = job.example_dir
+    
+    # Create results directory if it doesn't exist
+    RESULTS_DIR.mkdir(exist_ok=True)
     
-    run_examples(args.example)
\ No newline at end of file
+    # Generate timestamped results filename
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    results_filename = f"{example_dir.name}_{timestamp}.md"
+    job.new_results_path = RESULTS_DIR / results_filename
+    
+    # Find previous result file for this example if it exists
+    job.previous_result_path = get_results_index().get(example_dir)
+
+def stage_execute(job: ExampleJob):
+    """Stage 1: validate the example and run it (or stream its request)"""
+    example_dir = job.example_dir
+    example_path = example_dir / 'example.py'
+    prepare_result_paths(job)
+    
+    if not example_path.exists():
+        logger_main.info(f"Error: No example.py found in {example_dir}")
+        job.finish('skipped', "no example.py")
+        return
+    
+    # Validate example_path to ensure it's safe to execute
+    try:
+        # Resolve to absolute path to avoid directory traversal
+        example_path = example_path.resolve(strict=True)
+        # Check that it's within the expected directory structure
+        if not str(example_path).startswith(str(Path('docs/prompts').resolve())):
+            logger_main.info(f"Error: Example path {example_path} is outside the allowed directory")
+            job.finish('skipped', "outside docs/prompts")
+            return
+    except (RuntimeError, ValueError) as e:
+        logger_main.error(f"Error: Invalid example path {example_path}: {str(e)}")
+        job.finish('skipped', "invalid path")
+        return
+    job.example_path = example_path
+    
+    # The judge prompt from example.json, extracted when the registry was built
+    job.prompt = get_example_registry().prompt(example_dir)
+    
+    logger_main.info(f"\nTesting: {example_path}")
+    try:
+        model_id, region = example_bedrock_target(example_path)
+        rate_keys = (model_id, f"region:{region}")
+        if replay_mode != 'replay':
+            bedrock_rate_limiter.wait(*rate_keys)
+        
+        request = streaming_request(example_dir)
+        direct = direct_request(example_dir) if request is None else None
+        if direct is not None:
+            # Send the example.json request from this process; no script, pipe or JSON round trip
+            try:
+                job.response = send_example_request(*direct, region)
+            except ClientError as e:
+                if is_throttling_error(e):
+                    bedrock_rate_limiter.record_throttle(*rate_keys)
+                raise
+            bedrock_rate_limiter.record_success(*rate_keys)
+            job.returncode = 0
+        elif request is not None:
+            # Stream the request example.py sends, writing text to the results file as it arrives
+            try:
+                stream = stream_converse(request, region, job.new_results_path)
+            except ClientError as e:
+                if is_throttling_error(e):
+                    bedrock_rate_limiter.record_throttle(*rate_keys)
+                raise
+            job.usage = stream['usage']
+            bedrock_rate_limiter.record_success(*rate_keys)
+            job.returncode = 0
+            logger_main.info(
+                f"Streamed {job.name}: time to first token {stream['ttft_ms'] or 0:.0f} ms, "
+                f"inter-token p50/p90 {percentile(stream['inter_token_ms'], 50) or 0:.0f}/"
+                f"{percentile(stream['inter_token_ms'], 90) or 0:.0f} ms"
+            )
+        else:
+            # Run the example.py file and capture output
+            result = execute_with_retries(example_dir, example_path, rate_keys)
+            job.returncode = result.returncode
+            job.stdout = result.stdout
+            if result.returncode != 0:
+                # A failed run is not a result; the current one stays in place
+                last_line = (result.stderr.strip().splitlines() or ['no output'])[-1]
+                logger_main.error(f"Error: {job.name} exited with code {result.returncode}: {last_line}")
+                job.finish('error', f"exit code {result.returncode}: {last_line}")
+    
+    except subprocess.TimeoutExpired as e:
+        # Recorded in the execution history as a failure; the current result stays in place
+        logger_main.error(f"Error: {job.name} timed out after {EXAMPLE_MAX_ATTEMPTS} attempts, the last allowed {e.timeout:.0f} seconds")
+        job.finish('timeout', f"timed out after {e.timeout:.0f}s")
+    
+    except Exception as e:
+        _record_stage_error(job, e)
+
+def stage_extract(job: ExampleJob):
+    """Stage 2: extract the markdown from the example's output into the results file
+    
+    Output identical to the current result is recognised by hash and neither
+    written nor compared.
+    """
+    if job.response is not None:
+        text = response_text(job.response)
+        output = text if text is not None else json.dumps(job.response, indent=2, default=str)
+        job.usage = job.response.get('usage')
+    elif job.stdout is not None:
+        output = extract_output(job.stdout)
+        job.usage = response_usage(job.stdout)
+    else:
+        # Streamed straight to the results file
+        output = job.new_results_path.read_text()
+    
+    current = get_results_index().entry(job.example_dir)
+    if (job.previous_result_path and current and Path(current['path']) == job.previous_result_path
+            and current['sha256'] == hashlib.sha256(output.encode('utf-8')).hexdigest()):
+        record_judge_stat('exact')
+        if job.new_results_path.exists():
+            job.new_results_path.unlink()
+        logger_main.info(f"Output is identical to {job.previous_result_path}; nothing to write or compare")
+        job.finish('kept_old', str(job.previous_result_path))
+        return
+    
+    # Write the extracted content to results file
+    result_blobs.store(output, job.new_results_path)
+    logger_main.info(f"Results saved to: {job.new_results_path}")
+
+def stage_judge(job: ExampleJob):
+    """Stage 3: compare the new result with the previous one, if there is one"""
+    # Compare with previous results if they exist
+    if not job.previous_result_path:
+        get_results_index().set(job.example_dir, job.new_results_path, job.usage)
+        job.finish('new', str(job.new_results_path))
+        return
+    
+    job.response_choice, comparison_result = compare_results(job.prompt, job.previous_result_path, job.new_results_path,
+                                                             InputManifest.example_id(job.example_dir))
+
+def stage_publish(job: ExampleJob):
+    """Stage 4: make the winning result current and delete the loser
+    
+    example.md files and the results they replace are updated afterwards by
+    publish_docs, in one pass over the whole run.
+    """
+    if job.response_choice == "new_response":
+        get_results_index().set(job.example_dir, job.new_results_path, job.usage)
+        job.finish('promoted', str(job.new_results_path))
+        return
+    
+    # If old file still reigns, or the judge could not decide, delete the new one.
+    try:
+        job.new_results_path.unlink()
+        logger_main.info(f"Deleted new results file: {job.new_results_path}")
+    except Exception as e:
+        logger_main.error(f"Warning: Could not delete new results file: {str(e)}")
+    if job.response_choice == JUDGE_ERROR:
+        # Not a success, so the example runs again next time
+        job.finish('unjudged', "judge call failed; kept old result")
+        return
+    job.finish('kept_old', str(job.previous_result_path))
+
+def _record_stage_error(job: ExampleJob, error: Exception):
+    """Finish a job whose stage raised
+    
+    The error goes to the log and, through the outcome, to the run journal and
+    summary. Whatever the stage left of the new results file is deleted so that no
+    unreferenced file stays behind in results/.
+    """
+    logger_main.error(f"Error in {job.name}: {str(error)}")
+    current = get_results_index().get(job.example_dir)
+    if job.new_results_path and job.new_results_path.exists() and job.new_results_path != current:
+        try:
+            job.new_results_path.unlink()
+        except OSError as e:
+            logger_main.error(f"Warning: Could not delete new results file: {str(e)}")
+    job.finish('error', str(error))
+
+# The stages every example goes through, in order
+EXAMPLE_STAGES = (stage_execute, stage_extract, stage_judge, stage_publish)
+
+RUNS_DIR = CACHE_DIR / 'runs'
+
+# Journal state an example reaches when each stage completes without finishing the job
+STAGE_JOURNAL_STATES = {'stage_extract': 'executed', 'stage_judge': 'judged'}
+# Stages already done in each journal state, skipped when a run is resumed
+JOURNAL_COMPLETED_STAGES = {
+    'executed': ('stage_execute', 'stage_extract'),
+    'judged': ('stage_execute', 'stage_extract', 'stage_judge'),
+}
+
+class RunJournal:
+    """Write-ahead journal of a suite run, so an interrupted run can be resumed
+    
+    Each example moves through pending -> executed -> judged -> published (or
+    failed). Every transition is appended to results/.cache/runs/<run_id>.jsonl and
+    flushed to disk before the run moves on; on resume the last state of each
+    example decides which stages are skipped.
+    """
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.path = RUNS_DIR / f"{run_id}.jsonl"
+        self.lock = threading.Lock()
+        self.example_ids: list[str] = []
+        self.states: dict[str, dict] = {}
+        try:
+            with open(self.path) as f:
+                lines = f.readlines()
+        except OSError:
+            lines = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # A torn final line from a crash mid-write
+            if 'examples' in entry:
+                self.example_ids = entry['examples']
+            else:
+                self.states[entry['example']] = entry
+    
+    @classmethod
+    def create(cls, example_dirs: list[Path]) -> 'RunJournal':
+        """Start the journal of a new run over example_dirs"""
+        journal = cls(f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}")
+        journal.example_ids = [InputManifest.example_id(example_dir) for example_dir in example_dirs]
+        RUNS_DIR.mkdir(parents=True, exist_ok=True)
+        journal._append({'run': journal.run_id, 'examples': journal.example_ids})
+        return journal
+    
+    def _append(self, entry: dict):
+        with self.lock, open(self.path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def record(self, job: ExampleJob, state: str):
+        """Append the job's new state and everything needed to pick it up from there"""
+        entry = {
+            'example': InputManifest.example_id(job.example_dir),
+            'state': state,
+            'new_results_path': str(job.new_results_path) if job.new_results_path else None,
+            'previous_result_path': str(job.previous_result_path) if job.previous_result_path else None,
+            'prompt': job.prompt,
+            'returncode': job.returncode,
+            'usage': job.usage,
+            'response_choice': job.response_choice,
+            'outcome': asdict(job.outcome) if job.outcome else None,
+        }
+        self.states[entry['example']] = entry
+        self._append(entry)
+    
+    def after_stage(self, stage, job: ExampleJob):
+        """Journal the state a job reached by running stage"""
+        if job.outcome is not None:
+            self.record(job, 'published' if is_successful(job.outcome) else 'failed')
+        elif stage.__name__ in STAGE_JOURNAL_STATES:
+            self.record(job, STAGE_JOURNAL_STATES[stage.__name__])
+    
+    def job(self, example_dir: Path, **fields) -> ExampleJob:
+        """A job for example_dir that resumes from its journalled state
+        
+        Failed examples, and examples whose new result has gone missing, start over.
+        """
+        entry = self.states.get(InputManifest.example_id(example_dir))
+        state = entry['state'] if entry else 'pending'
+        if state in ('pending', 'failed') or (
+                state != 'published' and not Path(entry['new_results_path'] or '').is_file()):
+            job = ExampleJob(example_dir, **fields)
+            self.record(job, 'pending')
+            return job
+        
+        job = ExampleJob(
+            example_dir,
+            prompt=entry['prompt'],
+            new_results_path=Path(entry['new_results_path']) if entry['new_results_path'] else None,
+            previous_result_path=Path(entry['previous_result_path']) if entry['previous_result_path'] else None,
+            returncode=entry['returncode'],
+            usage=entry['usage'],
+            response_choice=entry['response_choice'],
+            completed=JOURNAL_COMPLETED_STAGES.get(state, ()),
+            **fields
+        )
+        if state == 'published':
+            job.outcome = ExampleOutcome(**entry['outcome'])
+        logger_main.info(f"Resuming {job.name} from state '{state}'")
+        return job
+
+# Journal of the run in progress, if any
+run_journal: Optional[RunJournal] = None
+
+def make_job(example_dir: Path, **fields) -> ExampleJob:
+    """A new job for example_dir, or one resuming where the journalled run left off"""
+    if run_journal is None:
+        return ExampleJob(example_dir, **fields)
+    return run_journal.job(example_dir, **fields)
+
+def run_stage(stage, job: ExampleJob):
+    """Run one stage on a job unless the job already finished; stage errors finish the job"""
+    if job.outcome is not None or stage.__name__ in job.completed:
+        return
+    try:
+        stage(job)
+    except Exception as e:
+        _record_stage_error(job, e)
+    if job.outcome is not None:
+        job.outcome.duration = time.monotonic() - job.started
+    if run_journal is not None:
+        run_journal.after_stage(stage, job)
+
+def run_single_example(example_dir: Path) -> ExampleOutcome:
+    """Run a single example from the specified directory
+    
+    Args:
+        example_dir: Path to the example directory
+        
+    Returns:
+        ExampleOutcome: What happened to the example, for the run summary
+    """
+    job = make_job(example_dir, started=time.monotonic())
+    for stage in EXAMPLE_STAGES:
+        run_stage(stage, job)
+    return job.outcome
+
+def update_example_md(example_dir: Path, results_path: Path) -> list[str]:
+    """
+    Update the example.md file in the example directory to point to the new results file.
+    
+    Only --8<-- snippets that include a file from results/ are rewritten, and the
+    file is replaced atomically, and only if one of them actually changes.
+    
+    Args:
+        example_dir: Path to the example directory
+        results_path: Path to the new results file
+    
+    Returns:
+        list[str]: The results files example.md included before, or [] if it was not changed
+    """
+    example_md_path = example_dir / 'example.md'
+    
+    # Check if example.md exists
+    if not example_md_path.exists():
+        logger_main.info(f"Warning: No example.md found in {example_dir}")
+        return []
+    
+    try:
+        # Read the content of the example.md file
+        with open(example_md_path, 'r') as f:
+            content = f.read()
+        
+        # Find the snippet lines that include a results file
+        pattern = rf'--8<-- "({re.escape(RESULTS_DIR.as_posix())}/[^"]+\.md)"'
+        matches = re.findall(pattern, content)
+        
+        if not matches:
+            logger_main.info(f"Warning: No results.md reference found in {example_md_path}")
+            return []
+        
+        relative_results_path = results_path.as_posix()
+        replaced = sorted(set(matches) - {relative_results_path})
+        if not replaced:
+            return []
+        
+        # Update each occurrence that matches the pattern
+        updated_content = re.sub(pattern, lambda match: f'--8<-- "{relative_results_path}"', content)
+        
+        # Write the updated content back to the file
+        atomic_write_text(example_md_path, updated_content)
+        
+        logger_main.info(f"Updated {example_md_path} to point to {relative_results_path}")
+        return replaced
+    
+    except Exception as e:
+        logger_main.error(f"Error updating example.md: {str(e)}")
+        return []
+
+CHANGED_PAGES_PATH = CACHE_DIR / 'changed_pages.txt'
+
+def publish_docs(example_dirs: list[Path]) -> list[Path]:
+    """
+    Publication pass: point each example.md at the example's current result
+    
+    Runs once at the end of a run, so every page is rewritten at most once and
+    only if its results reference changed. Results files no page includes any
+    more are deleted afterwards. The changed pages, relative to docs/, are
+    written to results/.cache/changed_pages.txt for a targeted mkdocs rebuild.
+    
+    Args:
+        example_dirs: The examples of the run
+        
+    Returns:
+        list[Path]: The example.md files that changed
+    """
+    index = get_results_index()
+    changed_pages, replaced = [], set()
+    for example_dir in example_dirs:
+        current = index.get(example_dir)
+        if current is None:
+            continue
+        previous = update_example_md(example_dir, current)
+        if previous:
+            changed_pages.append(example_dir / 'example.md')
+            replaced.update(previous)
+    
+    # The old results of updated pages, unless some example still uses them
+    in_use = {Path(entry['path']) for entry in index.entries.values()}
+    for results_path in sorted({Path(path) for path in replaced} - in_use):
+        try:
+            results_path.unlink()
+            logger_main.info(f"Deleted old results file: {results_path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger_main.error(f"Warning: Could not delete old results file: {str(e)}")
+    
+    pages = [page.resolve().relative_to(Path('docs').resolve()).as_posix() for page in changed_pages]
+    CHANGED_PAGES_PATH.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(CHANGED_PAGES_PATH, ''.join(f"{page}\n" for page in pages))
+    if pages:
+        logger_main.info(f"Published {len(pages)} changed pages (listed in {CHANGED_PAGES_PATH}): {', '.join(pages)}")
+    return changed_pages
+
+# Files in an example directory that do not affect what the example sends to Bedrock
+EXAMPLE_INPUT_EXCLUDES = {'example.md', 'example.sh', '.meta.yaml'}
+
+def example_input_hash(example_dir: Path) -> str:
+    """
+    Hash everything an example's run depends on
+    
+    Covers example.py, example.json and any side inputs in the directory
+    (messages.json, documents, images, ...) plus the model ID the example calls.
+    
+    Args:
+        example_dir: Path to the example directory
+        
+    Returns:
+        str: Hex digest that changes whenever any input changes
+    """
+    digest = hashlib.sha256()
+    model_id, region = example_bedrock_target(example_dir / 'example.py')
+    digest.update(f"{model_id}\0{region}\0".encode())
+    for path in sorted(example_dir.iterdir()):
+        if not path.is_file() or path.name in EXAMPLE_INPUT_EXCLUDES:
+            continue
+        data = path.read_bytes()
+        digest.update(f"{path.name}\0{len(data)}\0".encode())
+        digest.update(data)
+    return digest.hexdigest()
+
+class InputManifest:
+    """Input hashes of each example as of its last successful run, for --changed"""
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self.hashes: dict[str, str] = json.load(f)
+        except (OSError, ValueError):
+            self.hashes = {}
+    
+    @staticmethod
+    def example_id(example_dir: Path) -> str:
+        return example_dir.resolve().relative_to(Path('docs/prompts').resolve()).as_posix()
+    
+    def is_changed(self, example_dir: Path) -> bool:
+        """True if the example's inputs differ from its last successful run (or it never ran)"""
+        return self.hashes.get(self.example_id(example_dir)) != example_input_hash(example_dir)
+    
+    def mark_successful(self, example_dir: Path):
+        """Remember the example's current inputs and save the manifest"""
+        input_hash = example_input_hash(example_dir)
+        with self.lock:
+            self.hashes[self.example_id(example_dir)] = input_hash
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(self.path, json.dumps(self.hashes, indent=2, sort_keys=True))
+
+BLOB_DIR = CACHE_DIR / 'blobs'
+
+class ResultBlobStore:
+    """Content-addressed store of result texts (sha256 -> bytes)
+    
+    The timestamped results/*.md files that example.md snippets include are
+    copies of blobs rather than links, so editing or checking out a results file
+    can never change a blob, or another results file with the same text.
+    """
+    def __init__(self, root: Path):
+        self.root = root
+    
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+    
+    def store(self, text: str, results_path: Path) -> str:
+        """
+        Store text unless it is already present and make results_path refer to it
+        
+        Args:
+            text: The result text
+            results_path: The human-readable results file to create or replace
+            
+        Returns:
+            str: The sha256 of the text
+        """
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        blob_path = self.path(digest)
+        if blob_path.exists():
+            logger_main.info(f"Result already stored as {digest[:12]}; copying instead of writing")
+        else:
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(blob_path, text)
+        tmp_path = results_path.with_name(f".{results_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            shutil.copyfile(blob_path, tmp_path)
+            os.replace(tmp_path, results_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        return digest
+    
+    def prune(self, results_dir: Path = RESULTS_DIR) -> int:
+        """Delete blobs whose text no results file holds any more; returns how many were deleted"""
+        referenced = {hashlib.sha256(path.read_bytes()).hexdigest() for path in results_dir.glob('*.md')}
+        pruned = 0
+        for blob_path in self.root.glob('*/*'):
+            if blob_path.name not in referenced:
+                blob_path.unlink()
+                pruned += 1
+        return pruned
+
+result_blobs = ResultBlobStore(BLOB_DIR)
+
+RESULTS_INDEX_PATH = CACHE_DIR / 'results_index.json'
+
+def response_usage(stdout: Optional[str]) -> Optional[dict]:
+    """Token usage from an example's printed Converse response, if it has any"""
+    try:
+        usage = json.loads(stdout).get('usage')
+    except (TypeError, ValueError, AttributeError):
+        return None
+    return usage if isinstance(usage, dict) else None
+
+class ResultsIndex:
+    """Current result of each example: path, content hash, timestamp, model and usage
+    
+    Replaces globbing results/ for the previous result. The index lives in
+    results/.cache/results_index.json and can be rebuilt from the --8<-- references
+    in each example.md.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self.entries: dict[str, dict] = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+            self.rebuild()
+    
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(self.path, json.dumps(self.entries, indent=2, sort_keys=True))
+    
+    @staticmethod
+    def _entry(example_dir: Path, results_path: Path, usage: Optional[dict] = None) -> dict:
+        timestamp = re.search(r'_(\d{8}_\d{6})\.md$', results_path.name)
+        return {
+            'path': str(results_path),
+            'sha256': hashlib.sha256(results_path.read_bytes()).hexdigest(),
+            'timestamp': (datetime.strptime(timestamp.group(1), '%Y%m%d_%H%M%S') if timestamp
+                          else datetime.fromtimestamp(results_path.stat().st_mtime)).isoformat(),
+            'model': example_bedrock_target(example_dir / 'example.py')[0],
+            'usage': usage,
+        }
+    
+    def entry(self, example_dir: Path) -> Optional[dict]:
+        return self.entries.get(InputManifest.example_id(example_dir))
+    
+    def get(self, example_dir: Path) -> Optional[Path]:
+        """The example's current result file, or None if it has none on disk"""
+        entry = self.entry(example_dir)
+        if entry is None:
+            return None
+        path = Path(entry['path'])
+        if not path.exists():
+            logger_main.info(f"Indexed result {path} no longer exists")
+            return None
+        return path
+    
+    def set(self, example_dir: Path, results_path: Path, usage: Optional[dict] = None):
+        """Record results_path as the example's current result and save the index"""
+        entry = self._entry(example_dir, results_path, usage)
+        with self.lock:
+            self.entries[InputManifest.example_id(example_dir)] = entry
+            self._save()
+    
+    def rebuild(self, prompts_dir: Path = Path('docs/prompts')):
+        """Re-create the index from disk
+        
+        The result an example.md includes wins; examples without one fall back to
+        their newest exactly named results/<example>_<YYYYMMDD_HHMMSS>.md file.
+        """
+        entries = {}
+        for example_dir in find_example_dirs(prompts_dir):
+            current = None
+            try:
+                references = re.findall(r'--8<-- "([^"]+\.md)"', (example_dir / 'example.md').read_text())
+            except OSError:
+                references = []
+            for reference in references:
+                if Path(reference).parent == RESULTS_DIR and Path(reference).exists():
+                    current = Path(reference)
+                    break
+            if current is None:
+                name_pattern = re.compile(rf'{re.escape(example_dir.name)}_\d{{8}}_\d{{6}}\.md')
+                candidates = sorted(path for path in RESULTS_DIR.glob('*.md') if name_pattern.fullmatch(path.name))
+                current = candidates[-1] if candidates else None
+            if current is not None:
+                entries[InputManifest.example_id(example_dir)] = self._entry(example_dir, current)
+        with self.lock:
+            self.entries = entries
+            self._save()
+        logger_main.info(f"Rebuilt results index with {len(entries)} examples")
+
+results_index: Optional[ResultsIndex] = None
+_results_index_lock = threading.Lock()
+
+def get_results_index() -> ResultsIndex:
+    """The shared results index, loaded (or rebuilt) on first use"""
+    global results_index
+    with _results_index_lock:
+        if results_index is None:
+            results_index = ResultsIndex(RESULTS_INDEX_PATH)
+        return results_index
+
+# Outcome statuses after which an example's inputs count as successfully run
+SUCCESSFUL_STATUSES = ('new', 'promoted', 'kept_old')
+
+def is_successful(outcome: ExampleOutcome) -> bool:
+    """True if the example ran cleanly and its result went through comparison"""
+    return outcome.status in SUCCESSFUL_STATUSES and outcome.returncode == 0
+
+def find_example_dirs(prompts_dir: Path) -> list[Path]:
+    """Return every directory under prompts_dir containing an example.py, in a stable order"""
+    example_dirs = []
+    for root, dirs, files in os.walk(prompts_dir):
+        # Sort in place so os.walk visits subdirectories deterministically
+        dirs.sort()
+        if 'example.py' in files:
+            example_dirs.append(Path(root))
+    return example_dirs
+
+PROMPTS_DIR = Path('docs/prompts')
+EXAMPLE_REGISTRY_PATH = CACHE_DIR / 'example_registry.json'
+# Files of an example directory that are not side inputs
+EXAMPLE_OWN_FILES = {'example.py', 'example.json', 'example.md', 'example.sh', '.meta.yaml'}
+
+@dataclass
+class ExampleRecord:
+    """What the runner needs to know about an example, gathered once"""
+    example_id: str  # Path below docs/prompts, e.g. "reasoning/tool_calling"
+    name: str
+    category: str  # First directory below docs/prompts, e.g. "reasoning"
+    model_id: str
+    region: str
+    api: str  # 'converse', 'invoke_model' or 'unknown'
+    side_inputs: list[str]  # Other files the example reads, e.g. documents or images
+    prompt: str  # Judge prompt extracted from example.json
+    timeout: Optional[float] = None  # Seconds set in .meta.yaml, overriding the learned budget
+    prints_response: bool = False  # Marked in .meta.yaml: example.py prints the Converse response as-is
+    
+    @property
+    def example_dir(self) -> Path:
+        return PROMPTS_DIR / self.example_id
+
+def example_api(example_path: Path) -> str:
+    """Which Bedrock runtime API an example.py calls: 'converse', 'invoke_model' or 'unknown'"""
+    try:
+        source = example_path.read_text()
+    except OSError:
+        return 'unknown'
+    if re.search(r'\.converse(_stream)?\(', source):
+        return 'converse'
+    if re.search(r'\.invoke_model(_with_response_stream)?\(', source):
+        return 'invoke_model'
+    return 'unknown'
+
+def example_meta(example_dir: Path) -> dict:
+    """
+    The runner settings in the .meta.yaml of an example, over those of its category
+    
+    .meta.yaml is the per-directory metadata that already holds the docs tags, so
+    settings stay out of example.json, which readers send as-is. The runner reads
+    these keys and ignores the rest:
+    
+        timeout: 300           # Seconds example.py may run, instead of the budget
+                               # learnt from the execution history (example_timeout)
+        prints_response: true  # example.py prints the Converse response and nothing else,
+                               # so its request may be streamed (streaming_request) and a
+                               # conforming example.json sent instead (example_json_usable)
+    
+    An example's own .meta.yaml overrides the one of its category directory.
+    """
+    meta = {}
+    for meta_path in (example_dir.parent / '.meta.yaml', example_dir / '.meta.yaml'):
+        try:
+            with open(meta_path) as f:
+                loaded = yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            continue
+        except (OSError, yaml.YAMLError) as e:
+            logger_main.error(f"Error reading {meta_path}: {str(e)}")
+            continue
+        if isinstance(loaded, dict):
+            meta.update(loaded)
+    return meta
+
+def example_timeout_override(example_dir: Path, meta: Optional[dict] = None) -> Optional[float]:
+    """The "timeout" (in seconds) set in .meta.yaml, if any; see example_meta"""
+    meta = example_meta(example_dir) if meta is None else meta
+    if 'timeout' not in meta:
+        return None
+    if isinstance(meta['timeout'], (int, float)) and meta['timeout'] > 0:
+        return float(meta['timeout'])
+    logger_main.error(f"Ignoring invalid timeout in .meta.yaml of {example_dir}: {meta['timeout']!r}")
+    return None
+
+class ExampleRegistry:
+    """Every example under docs/prompts, scanned once
+    
+    The records are cached in results/.cache/example_registry.json together with
+    the mtimes of every directory and example file they were built from, and are
+    rebuilt when any of those changes.
+    """
+    def __init__(self, prompts_dir: Path = PROMPTS_DIR, snapshot_path: Path = EXAMPLE_REGISTRY_PATH):
+        self.prompts_dir = prompts_dir
+        self.snapshot_path = snapshot_path
+        self.records: dict[str, ExampleRecord] = {}
+        if not self._load_snapshot():
+            self.scan()
+        self._by_name: dict[str, list[ExampleRecord]] = {}
+        for record in self.records.values():
+            self._by_name.setdefault(record.name, []).append(record)
+    
+    def _mtimes(self) -> dict[str, int]:
+        """mtimes of every directory below prompts_dir and of each example.py, example.json and .meta.yaml"""
+        mtimes = {}
+        for root, dirs, files in os.walk(self.prompts_dir):
+            mtimes[root] = os.stat(root).st_mtime_ns
+            for name in ('example.py', 'example.json', '.meta.yaml'):
+                if name in files:
+                    path = os.path.join(root, name)
+                    mtimes[path] = os.stat(path).st_mtime_ns
+        return mtimes
+    
+    def _load_snapshot(self) -> bool:
+        try:
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if snapshot.get('mtimes') != self._mtimes():
+            return False
+        self.records = {record['example_id']: ExampleRecord(**record) for record in snapshot['records']}
+        return True
+    
+    def scan(self):
+        """Re-read every example and save the snapshot"""
+        records = {}
+        for example_dir in find_example_dirs(self.prompts_dir):
+            example_id = example_dir.relative_to(self.prompts_dir).as_posix()
+            model_id, region = example_bedrock_target(example_dir / 'example.py')
+            meta = example_meta(example_dir)
+            records[example_id] = ExampleRecord(
+                example_id=example_id,
+                name=example_dir.name,
+                category=example_id.split('/')[0],
+                model_id=model_id,
+                region=region,
+                api=example_api(example_dir / 'example.py'),
+                side_inputs=sorted(path.name for path in example_dir.iterdir()
+                                   if path.is_file() and path.name not in EXAMPLE_OWN_FILES),
+                prompt=extract_prompt_from_json(example_dir / 'example.json'),
+                timeout=example_timeout_override(example_dir, meta),
+                prints_response=meta.get('prints_response') is True,
+            )
+        self.records = records
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(self.snapshot_path, json.dumps({
+            'mtimes': self._mtimes(),
+            'records': [asdict(record) for record in records.values()],
+        }, indent=2))
+        logger_main.info(f"Scanned {len(records)} examples under {self.prompts_dir}")
+    
+    def get(self, example_dir: Path) -> Optional[ExampleRecord]:
+        return self.records.get(InputManifest.example_id(example_dir))
+    
+    def prompt(self, example_dir: Path) -> str:
+        """The judge prompt of an example, without re-reading its example.json"""
+        record = self.get(example_dir)
+        return record.prompt if record else extract_prompt_from_json(example_dir / 'example.json')
+    
+    def lookup(self, pattern: str) -> list[ExampleRecord]:
+        """
+        Find examples by exact name, ID (category/name) or glob over either
+        
+        Raises:
+            LookupError: If a bare name matches examples in several categories
+        """
+        if any(char in pattern for char in '*?['):
+            return [record for record in self.records.values()
+                    if fnmatch.fnmatchcase(record.name, pattern) or fnmatch.fnmatchcase(record.example_id, pattern)]
+        if pattern in self.records:
+            return [self.records[pattern]]
+        matches = self._by_name.get(pattern, [])
+        if len(matches) > 1:
+            raise LookupError(f"'{pattern}' is ambiguous; use one of: {', '.join(r.example_id for r in matches)}")
+        return matches
+    
+    def select(self, pattern: Optional[str] = None, category: Optional[str] = None,
+               model: Optional[str] = None) -> list[ExampleRecord]:
+        """
+        Examples matching a name, ID or glob (all if None), filtered by category and model
+        
+        Args:
+            pattern: See lookup
+            category: Category directory, e.g. "reasoning"
+            model: Substring of the model ID, e.g. "nova-2-lite"
+            
+        Returns:
+            list[ExampleRecord]: The matching examples in discovery order
+        """
+        records = self.lookup(pattern) if pattern else list(self.records.values())
+        return [record for record in records
+                if (category is None or record.category == category)
+                and (model is None or model in record.model_id)]
+
+example_registry: Optional[ExampleRegistry] = None
+_example_registry_lock = threading.Lock()
+
+def get_example_registry() -> ExampleRegistry:
+    """The shared example registry, loaded from its snapshot or scanned on first use"""
+    global example_registry
+    with _example_registry_lock:
+        if example_registry is None:
+            example_registry = ExampleRegistry()
+        return example_registry
+
+_STOP = object()  # Sentinel telling a pipeline stage worker to exit
+
+def _stage_worker(stage, inbox: queue.Queue, outbox: queue.Queue, stopping: threading.Event):
+    """Take jobs from inbox, run the stage with the job's log buffer active, pass them on
+    
+    Once stopping is set, jobs still queued are dropped unrun and finished ones are not
+    passed on, so an interrupted run winds down after the stages already in progress.
+    """
+    while True:
+        job = inbox.get()
+        if job is _STOP:
+            return
+        if stopping.is_set():
+            continue
+        _log_context.records = job.log_records
+        try:
+            run_stage(stage, job)
+        finally:
+            _log_context.records = None
+        if not stopping.is_set():
+            outbox.put(job)
+
+def run_pipeline(example_dirs: list[Path], workers: int, judge_workers: Optional[int] = None) -> list[ExampleOutcome]:
+    """
+    Run examples through execute -> extract -> judge -> publish stages
+    
+    Each stage has its own worker threads and hands jobs on through a bounded
+    queue, so a slow judge call for one example overlaps the execution of the next
+    and a backed-up stage throttles the ones before it. Publishing is a single
+    worker, so example.md files are never written concurrently. Log records are
+    buffered per example and replayed in discovery order as examples finish.
+    
+    Args:
+        example_dirs: Example directories to run
+        workers: Examples executing at the same time
+        judge_workers: Comparisons in flight at the same time (default: workers)
+        
+    Returns:
+        list[ExampleOutcome]: One outcome per example, in the order given
+    """
+    judge_workers = judge_workers or workers
+    stage_workers = {stage_execute: workers, stage_extract: 1, stage_judge: judge_workers, stage_publish: 1}
+    queues = [queue.Queue(maxsize=max(workers, judge_workers)) for _ in EXAMPLE_STAGES]
+    done: queue.Queue = queue.Queue()
+    stopping = threading.Event()
+    
+    threads = []
+    for i, stage in enumerate(EXAMPLE_STAGES):
+        outbox = queues[i + 1] if i + 1 < len(EXAMPLE_STAGES) else done
+        for n in range(stage_workers[stage]):
+            thread = threading.Thread(target=_stage_worker, args=(stage, queues[i], outbox, stopping),
+                                      name=f"{stage.__name__}-{n}", daemon=True)
+            thread.start()
+            threads.append(thread)
+    
+    jobs = [make_job(example_dir, log_records=[]) for example_dir in example_dirs]
+    
+    def feed():
+        for job in jobs:
+            if stopping.is_set():
+                return
+            job.started = time.monotonic()
+            queues[0].put(job)
+    feeder = threading.Thread(target=feed, name='pipeline-feed', daemon=True)
+    
+    log_buffer = ExampleLogBuffer()
+    root_handlers = logging.getLogger().handlers
+    for handler in root_handlers:
+        handler.addFilter(log_buffer)
+    try:
+        feeder.start()
+        # Replay each example's logs in discovery order as soon as it and its predecessors finish
+        finished, next_index = set(), 0
+        index_of = {id(job): i for i, job in enumerate(jobs)}
+        while next_index < len(jobs):
+            finished.add(index_of[id(done.get())])
+            while next_index in finished:
+                for record in jobs[next_index].log_records:
+                    for handler in root_handlers:
+                        handler.handle(record)
+                next_index += 1
+    finally:
+        for handler in root_handlers:
+            handler.removeFilter(log_buffer)
+        # On an interrupt, start no further stages; the journal keeps where each job got to.
+        # Workers drop what is still queued, so the stop sentinels below get through promptly.
+        stopping.set()
+        for i, stage in enumerate(EXAMPLE_STAGES):
+            for _ in range(stage_workers[stage]):
+                queues[i].put(_STOP)
+        for thread in threads:
+            thread.join()
+    return [job.outcome for job in jobs]
+
+def log_summary(outcomes: list[ExampleOutcome], wall_time: float):
+    """Log a summary table of all example outcomes"""
+    if not outcomes:
+        return
+    name_width = max(len('Example'), *(len(o.name) for o in outcomes))
+    lines = [
+        f"{'Example':<{name_width}}  {'Status':<10}  {'Seconds':>8}  Detail",
+        f"{'-' * name_width}  {'-' * 10}  {'-' * 8}  {'-' * 6}",
+    ]
+    for o in outcomes:
+        lines.append(f"{o.name:<{name_width}}  {o.status:<10}  {o.duration:>8.1f}  {o.detail}")
+    counts = {}
+    for o in outcomes:
+        counts[o.status] = counts.get(o.status, 0) + 1
+    totals = ', '.join(f"{status}: {count}" for status, count in sorted(counts.items()))
+    lines.append(f"\n{len(outcomes)} examples in {wall_time:.1f}s ({totals})")
+    logger_main.info("Run summary:\n" + '\n'.join(lines))
+
+def run_examples(example_name: str = None, workers: int = 1, executor: str = 'subprocess',
+                 changed_only: bool = False, judge_workers: Optional[int] = None,
+                 resume: Optional[str] = None, category: Optional[str] = None,
+                 model: Optional[str] = None) -> list[ExampleOutcome]:
+    """Run examples, either all or a specific one based on the example_name
+    
+    Args:
+        example_name: Name, ID or glob of the examples to run, or None for all
+        workers: Number of examples to execute concurrently
+        judge_workers: Number of comparisons to run concurrently (default: workers)
+        executor: 'subprocess' for a fresh interpreter per example, 'warm' for a
+            pool of pre-warmed interpreters, 'json' to send example.json requests
+            directly where they conform to example.py
+        changed_only: Only run examples whose inputs changed since their last
+            successful run
+        resume: ID of an interrupted run to finish; its examples are run again
+            from the last journalled state of each
+        category: Only run examples in this category, e.g. "reasoning"
+        model: Only run examples whose model ID contains this, e.g. "nova-2-lite"
+        
+    Returns:
+        list[ExampleOutcome]: Outcome of every example that was run
+    """
+    with example_executor(executor, workers, judge_workers or workers):
+        return _run_examples(example_name, workers, changed_only, judge_workers, resume, category, model)
+
+@contextlib.contextmanager
+def example_executor(executor: str, workers: int, judge_workers: int = 0):
+    """Set up how execute_example runs scripts for the duration of a run
+    
+    Args:
+        executor: 'subprocess', 'warm' or 'json' (send example.json requests directly
+            where they match example.py, and run the other examples as subprocesses)
+        workers: Number of examples that may execute at the same time
+        judge_workers: Number of comparisons that may run at the same time, sharing
+            the clients of the executing examples
+    """
+    global warm_pool, client_pool_size, json_executor
+    client_pool_size = max(client_pool_size, workers + judge_workers)
+    if executor == 'json':
+        # Examples the JSON executor cannot send still run as scripts
+        json_executor = True
+        executor = 'subprocess'
+    if replay_mode != 'off' and executor == 'subprocess':
+        # Record/replay hooks live in this process's clients, so examples must run in-process
+        logger_main.info(f"Replay mode '{replay_mode}' needs in-process execution; using the warm executor")
+        executor = 'warm'
+    if executor == 'warm':
+        warm_pool = WarmInterpreterPool(workers)
+    try:
+        yield
+    finally:
+        json_executor = False
+        if warm_pool is not None:
+            warm_pool.close()
+            warm_pool = None
+
+def select_example_dirs(example_name: Optional[str], category: Optional[str] = None,
+                        model: Optional[str] = None) -> list[Path]:
+    """
+    Return the directories of the examples to run
+    
+    Args:
+        example_name: Example name, ID (e.g. "reasoning/tool_calling") or glob; every example if None
+        category: Only examples in this category, e.g. "reasoning"
+        model: Only examples whose model ID contains this, e.g. "nova-2-lite"
+    """
+    try:
+        records = get_example_registry().select(example_name, category, model)
+    except LookupError as e:
+        logger_main.error(f"Error: {str(e)}")
+        return []
+    if not records:
+        logger_main.error(f"Error: No example matches '{example_name or '*'}'"
+                          + (f" in category '{category}'" if category else '')
+                          + (f" with model '{model}'" if model else ''))
+    return [record.example_dir for record in records]
+
+def _run_examples(example_name: Optional[str], workers: int, changed_only: bool,
+                  judge_workers: Optional[int], resume: Optional[str] = None,
+                  category: Optional[str] = None, model: Optional[str] = None) -> list[ExampleOutcome]:
+    """Discover and run examples; see run_examples"""
+    global run_journal
+    manifest = InputManifest(CACHE_DIR / 'input_manifest.json')
+    if resume:
+        run_journal = RunJournal(resume)
+        if not run_journal.example_ids:
+            logger_main.error(f"Error: No journal found for run {resume} in {RUNS_DIR}")
+            run_journal = None
+            return []
+        example_dirs = [Path('docs/prompts') / example_id for example_id in run_journal.example_ids]
+    else:
+        example_dirs = select_example_dirs(example_name, category, model)
+        
+        if changed_only:
+            changed = [example_dir for example_dir in example_dirs if manifest.is_changed(example_dir)]
+            logger_main.info(f"{len(changed)} of {len(example_dirs)} examples have changed inputs")
+            example_dirs = changed
+        run_journal = RunJournal.create(example_dirs)
+    logger_main.info(f"Run ID: {run_journal.run_id} (if interrupted, finish it with --resume {run_journal.run_id})")
+    
+    started = time.monotonic()
+    try:
+        if len(example_dirs) > 1:
+            outcomes = run_pipeline(example_dirs, workers, judge_workers)
+        else:
+            outcomes = [run_single_example(example_dir) for example_dir in example_dirs]
+    finally:
+        run_journal = None
+        publish_docs(example_dirs)
+    for example_dir, outcome in zip(example_dirs, outcomes):
+        if is_successful(outcome):
+            manifest.mark_successful(example_dir)
+    pruned = result_blobs.prune()
+    if pruned:
+        logger_main.info(f"Pruned {pruned} stored results no longer held by results/")
+    
+    if len(example_dirs) <= 1:
+        return outcomes
+    log_summary(outcomes, time.monotonic() - started)
+    logger_main.info("Adaptive rates (calls/minute): " + ', '.join(
+        f"{key}={rate:.1f}" for key, rate in sorted(bedrock_rate_limiter.rates().items())))
+    saved = judge_stats['exact'] + judge_stats['similar'] + judge_stats['cached']
+    logger_main.info(
+        f"Judge calls: {judge_stats['judged']} made, {saved} saved "
+        f"({judge_stats['exact']} exact, {judge_stats['similar']} similar, {judge_stats['cached']} cached)"
+    )
+    if tiered_judge:
+        logger_main.info(
+            f"Tiered judging: {judge_stats['fast']} decided by {fast_judge_model_id}, "
+            f"{judge_stats['escalated']} escalated to {JUDGE_MODEL_ID}"
+        )
+    for tier, latencies in sorted(judge_tier_latencies.items()):
+        logger_main.info(
+            f"Judge latency ({tier} tier, {len(latencies)} calls): "
+            f"p50 {percentile(latencies, 50):.2f}s, p95 {percentile(latencies, 95):.2f}s"
+        )
+    return outcomes
+
+BENCHMARK_DIR = RESULTS_DIR / 'benchmarks'
+BENCHMARK_METRICS = ('wall_ms', 'latency_ms', 'ttfb_ms', 'ttft_ms', 'inter_token_ms',
+                     'input_tokens', 'output_tokens', 'output_tokens_per_sec')
+
+def percentile(values: list[float], pct: float) -> Optional[float]:
+    """Linearly interpolated percentile of values (pct in 0-100), or None if empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+def benchmark_sample(example_dir: Path, iteration: int) -> dict:
+    """Run an example once and measure wall time, server latency, TTFB and token usage"""
+    example_path = (example_dir / 'example.py').resolve()
+    model_id, region = example_bedrock_target(example_path)
+    rate_keys = (model_id, f"region:{region}")
+    if replay_mode != 'replay':
+        bedrock_rate_limiter.wait(*rate_keys)
+    
+    sample = {'example': example_dir.name, 'model': model_id, 'iteration': iteration}
+    request = streaming_request(example_dir)
+    if request is not None:
+        return _benchmark_stream_sample(sample, request, region, rate_keys)
+    direct = direct_request(example_dir)
+    started = time.perf_counter()
+    if direct is not None:
+        try:
+            response = send_example_request(*direct, region)
+        except Exception as e:
+            if is_throttling_error(e):
+                bedrock_rate_limiter.record_throttle(*rate_keys)
+            sample.update(wall_ms=(time.perf_counter() - started) * 1000, status='error')
+            return sample
+        sample.update(wall_ms=(time.perf_counter() - started) * 1000, status='ok')
+        bedrock_rate_limiter.record_success(*rate_keys)
+    else:
+        example_id, timeout = InputManifest.example_id(example_dir), example_timeout(example_dir)
+        try:
+            result = execute_example(example_path, timeout)
+        except subprocess.TimeoutExpired:
+            get_execution_history().add(example_id, 'timeout', timeout, timeout)
+            sample.update(wall_ms=(time.perf_counter() - started) * 1000, status='timeout')
+            return sample
+        sample['wall_ms'] = (time.perf_counter() - started) * 1000
+        sample['status'] = 'ok' if result.returncode == 0 else 'error'
+        get_execution_history().add(example_id, sample['status'], sample['wall_ms'] / 1000, timeout)
+        if result.returncode == 0:
+            bedrock_rate_limiter.record_success(*rate_keys)
+        elif is_throttled_output(result.stderr):
+            bedrock_rate_limiter.record_throttle(*rate_keys)
+        
+        timings = getattr(result, 'call_timings', None)
+        if timings:
+            sample['ttfb_ms'] = timings[0]['ttfb_ms']
+        try:
+            response = json.loads(result.stdout)
+        except ValueError:
+            response = None
+    if isinstance(response, dict):
+        usage = response.get('usage', {})
+        sample['input_tokens'] = usage.get('inputTokens')
+        sample['output_tokens'] = usage.get('outputTokens')
+        sample['latency_ms'] = response.get('metrics', {}).get('latencyMs')
+        generation_ms = sample['latency_ms'] or sample['wall_ms']
+        if sample['output_tokens'] and generation_ms:
+            sample['output_tokens_per_sec'] = sample['output_tokens'] / (generation_ms / 1000)
+    return sample
+
+def _benchmark_stream_sample(sample: dict, request: dict, region: str, rate_keys: tuple) -> dict:
+    """Fill in a benchmark sample by streaming the example.json request"""
+    started = time.perf_counter()
+    try:
+        stream = stream_converse(request, region)
+    except ClientError as e:
+        if is_throttling_error(e):
+            bedrock_rate_limiter.record_throttle(*rate_keys)
+        sample.update(wall_ms=(time.perf_counter() - started) * 1000, status='error')
+        return sample
+    bedrock_rate_limiter.record_success(*rate_keys)
+    sample.update(
+        wall_ms=(time.perf_counter() - started) * 1000,
+        status='ok',
+        ttft_ms=stream['ttft_ms'],
+        inter_token_ms=percentile(stream['inter_token_ms'], 50),
+        latency_ms=stream['latency_ms'],
+        input_tokens=stream['usage'].get('inputTokens'),
+        output_tokens=stream['usage'].get('outputTokens'),
+    )
+    generation_ms = sample['latency_ms'] or sample['wall_ms']
+    if sample['output_tokens'] and generation_ms:
+        sample['output_tokens_per_sec'] = sample['output_tokens'] / (generation_ms / 1000)
+    return sample
+
+def benchmark_examples(example_dirs: list[Path], iterations: int, workers: int) -> list[dict]:
+    """
+    Run each example iterations times with up to workers executions in flight
+    
+    Returns:
+        list[dict]: One sample per execution, in example then iteration order
+    """
+    jobs = [(example_dir, i) for example_dir in example_dirs for i in range(iterations)]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='benchmark') as executor:
+        return list(executor.map(lambda job: benchmark_sample(*job), jobs))
+
+def summarize_benchmark(samples: list[dict]) -> dict:
+    """p50/p90/p99 of every metric, grouped per example and per model"""
+    summary = {'examples': {}, 'models': {}}
+    for scope, field in (('examples', 'example'), ('models', 'model')):
+        groups: dict[str, list[dict]] = {}
+        for sample in samples:
+            groups.setdefault(sample[field], []).append(sample)
+        for name, group in sorted(groups.items()):
+            stats = {
+                'runs': len(group),
+                'failures': sum(1 for sample in group if sample['status'] != 'ok'),
+            }
+            for metric in BENCHMARK_METRICS:
+                values = [sample[metric] for sample in group if sample['status'] == 'ok' and sample.get(metric) is not None]
+                stats[metric] = {f"p{pct}": percentile(values, pct) for pct in (50, 90, 99)}
+            summary[scope][name] = stats
+    return summary
+
+def write_benchmark_report(samples: list[dict], summary: dict, output_dir: Path) -> tuple[Path, Path]:
+    """Write the samples and summary as JSON and the summary as CSV
+    
+    Returns:
+        tuple[Path, Path]: Paths of the JSON and CSV reports
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    json_path = output_dir / f"benchmark_{timestamp}.json"
+    csv_path = output_dir / f"benchmark_{timestamp}.csv"
+    atomic_write_text(json_path, json.dumps({'samples': samples, 'summary': summary}, indent=2))
+    
+    rows = io.StringIO()
+    writer = csv.writer(rows)
+    writer.writerow(['Scope', 'Name', 'Runs', 'Failures', 'Metric', 'p50', 'p90', 'p99'])
+    for scope, groups in summary.items():
+        for name, stats in groups.items():
+            for metric in BENCHMARK_METRICS:
+                writer.writerow([scope, name, stats['runs'], stats['failures'], metric,
+                                 *(stats[metric][f"p{pct}"] for pct in (50, 90, 99))])
+    atomic_write_text(csv_path, rows.getvalue())
+    return json_path, csv_path
+
+def compare_to_baseline(summary: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Flag examples whose latency regressed against a stored baseline summary
+    
+    Args:
+        summary: Summary from summarize_benchmark
+        baseline: An earlier summary
+        threshold: Allowed relative increase (0.2 = 20%) before a metric is flagged
+        
+    Returns:
+        list[str]: A description of every regression found
+    """
+    regressions = []
+    for name, stats in summary['examples'].items():
+        previous = baseline.get('examples', {}).get(name)
+        if not previous:
+            continue
+        for metric in ('wall_ms', 'latency_ms', 'ttfb_ms'):
+            for pct in ('p50', 'p90'):
+                current, before = stats[metric][pct], previous.get(metric, {}).get(pct)
+                if current is not None and before and current > before * (1 + threshold):
+                    regressions.append(f"{name} {metric} {pct}: {before:.0f} -> {current:.0f} ({current / before - 1:+.0%})")
+    return regressions
+
+def run_benchmark(example_name: Optional[str], iterations: int, workers: int, executor: str,
+                  baseline_path: Path, threshold: float, save_baseline: bool) -> list[str]:
+    """
+    Benchmark examples, write JSON/CSV reports and compare against the baseline
+    
+    Returns:
+        list[str]: Regressions found against the baseline (empty if none or no baseline)
+    """
+    example_dirs = select_example_dirs(example_name)
+    with example_executor(executor, workers):
+        samples = benchmark_examples(example_dirs, iterations, workers)
+    summary = summarize_benchmark(samples)
+    json_path, csv_path = write_benchmark_report(samples, summary, BENCHMARK_DIR)
+    logger_main.info(f"Benchmark reports written to {json_path} and {csv_path}")
+    
+    for name, stats in summary['examples'].items():
+        wall, tps = stats['wall_ms'], stats['output_tokens_per_sec']
+        logger_main.info(
+            f"{name}: wall p50/p90/p99 {wall['p50'] or 0:.0f}/{wall['p90'] or 0:.0f}/{wall['p99'] or 0:.0f} ms, "
+            f"output {tps['p50'] or 0:.1f} tok/s, {stats['failures']}/{stats['runs']} failed"
+        )
+    
+    regressions = []
+    if baseline_path.exists():
+        with open(baseline_path) as f:
+            regressions = compare_to_baseline(summary, json.load(f), threshold)
+        for regression in regressions:
+            logger_main.warning(f"Regression: {regression}")
+        if not regressions:
+            logger_main.info(f"No regressions beyond {threshold:.0%} against {baseline_path}")
+    if save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(baseline_path, json.dumps(summary, indent=2))
+        logger_main.info(f"Saved baseline to {baseline_path}")
+    return regressions
+
+BATCH_DIR = RESULTS_DIR / 'batch'
+BATCH_MIN_RECORDS = 100  # Bedrock rejects batch inference jobs with fewer records than this
+
+# Converse inferenceConfig fields and their names in the Nova InvokeModel body
+NOVA_INFERENCE_FIELDS = {'maxTokens': 'max_new_tokens', 'temperature': 'temperature', 'topP': 'top_p',
+                         'topK': 'top_k', 'stopSequences': 'stopSequences'}
+
+def nova_native_body(request: dict) -> dict:
+    """
+    Translate Converse keyword arguments into the Nova InvokeModel body batch inference expects
+    
+    Args:
+        request: A Converse request as returned by load_converse_request
+        
+    Returns:
+        dict: The messages-v1 body for the record's modelInput
+    """
+    body = {'schemaVersion': 'messages-v1', 'messages': request['messages']}
+    if request.get('system'):
+        body['system'] = request['system']
+    if request.get('toolConfig'):
+        body['toolConfig'] = request['toolConfig']
+    inference = {NOVA_INFERENCE_FIELDS[k]: v for k, v in (request.get('inferenceConfig') or {}).items()
+                 if k in NOVA_INFERENCE_FIELDS}
+    # Converse passes additionalModelRequestFields (e.g. reasoningConfig, topK) through to the body
+    for key, value in (request.get('additionalModelRequestFields') or {}).items():
+        if key == 'inferenceConfig' and isinstance(value, dict):
+            inference.update({NOVA_INFERENCE_FIELDS.get(k, k): v for k, v in value.items()})
+        else:
+            body[key] = value
+    if inference:
+        body['inferenceConfig'] = inference
+    return body
+
+def batch_record_id(kind: str, identity: str) -> str:
+    """Stable recordId for an example ('example') or a judge comparison ('judge')"""
+    return f"{kind}-{content_hash(kind, identity)[:16]}"
+
+def _load_batch_state(name: str) -> dict:
+    try:
+        with open(BATCH_DIR / name) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_batch_state(name: str, state: dict):
+    BATCH_DIR.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(BATCH_DIR / name, json.dumps(state, indent=2, sort_keys=True))
+
+def _write_batch_file(path: Path, records: list[dict]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(path, ''.join(json.dumps(record) + '\n' for record in records))
+    logger_main.info(f"Wrote {len(records)} records to {path}")
+    if len(records) < BATCH_MIN_RECORDS:
+        logger_main.info(f"Warning: Bedrock batch jobs need at least {BATCH_MIN_RECORDS} records; "
+                         f"run {path.name} on demand or combine it with other records")
+
+def export_example_batch(example_dirs: list[Path], output_dir: Path = BATCH_DIR) -> list[Path]:
+    """
+    Write the example.json request of each example as Bedrock batch-inference records
+    
+    Batch jobs run a single model, so records are grouped into one JSONL file per model.
+    Record IDs are looked up in results/batch/records.json on import. Examples whose
+    example.json cannot stand in for example.py (see example_json_usable) are skipped.
+    
+    Args:
+        example_dirs: Example directories to export
+        output_dir: Directory for the JSONL files
+        
+    Returns:
+        list[Path]: The files written
+    """
+    index = _load_batch_state('records.json')
+    groups: dict[str, list[dict]] = {}
+    for example_dir in example_dirs:
+        request = load_converse_request(example_dir)
+        if request is None:
+            logger_main.info(f"Skipping {example_dir.name}: example.json is not a Converse request")
+            continue
+        if not example_json_usable(example_dir):
+            logger_main.info(f"Skipping {example_dir.name}: example.json cannot stand in for example.py")
+            continue
+        example_id = InputManifest.example_id(example_dir)
+        record_id = batch_record_id('example', example_id)
+        model_id = request['modelId']
+        groups.setdefault(model_id, []).append({'recordId': record_id, 'modelInput': nova_native_body(request)})
+        index[record_id] = {'kind': 'example', 'example': example_id, 'modelId': model_id}
+    
+    paths = []
+    for model_id, records in sorted(groups.items()):
+        path = output_dir / f"examples_{re.sub(r'[^A-Za-z0-9.-]', '_', model_id)}.jsonl"
+        _write_batch_file(path, records)
+        paths.append(path)
+    _save_batch_state('records.json', index)
+    return paths
+
+def _read_pair(entry: dict) -> Optional[tuple[str, str]]:
+    try:
+        return Path(entry['previous']).read_text(), Path(entry['new']).read_text()
+    except OSError as e:
+        logger_main.error(f"Error reading pending comparison: {str(e)}")
+        return None
+
+def needs_judge_call(old_content: str, new_content: str, prompt: str) -> bool:
+    """True unless compare_results can settle the pair without calling a model"""
+    if old_content == new_content:
+        return False
+    if prejudge_method != 'off' and output_similarity(old_content, new_content, prejudge_method) >= prejudge_threshold:
+        return False
+    return judge_cache is None or judge_cache.get(judge_cache_key(old_content, new_content, prompt)) is None
+
+def export_judge_batch(output_dir: Path = BATCH_DIR) -> Optional[Path]:
+    """
+    Write the judge prompt of each pending comparison as Bedrock batch-inference records
+    
+    Pending comparisons are left by "batch import --defer-judge". Pairs that are
+    identical, similar enough or already have a cached verdict are not exported.
+    
+    Args:
+        output_dir: Directory for the JSONL file
+        
+    Returns:
+        Optional[Path]: The file written, or None if no comparison needs the judge
+    """
+    index = _load_batch_state('records.json')
+    pending = _load_batch_state('pending.json')
+    records = []
+    for example_id, entry in sorted(pending.items()):
+        pair = _read_pair(entry)
+        prompt = get_example_registry().prompt(PROMPTS_DIR / example_id)
+        if pair is None or not needs_judge_call(*pair, prompt):
+            continue
+        cache_key = judge_cache_key(*pair, prompt)
+        prompt_text, _ = build_judge_prompt(*pair, prompt, judge_mode)
+        record_id = batch_record_id('judge', cache_key)
+        records.append({'recordId': record_id, 'modelInput': judge_request_body(prompt_text)})
+        index[record_id] = {'kind': 'judge', 'example': example_id, 'cache_key': cache_key}
+    
+    if not records:
+        logger_main.info(f"None of the {len(pending)} pending comparisons needs the judge")
+        return None
+    path = output_dir / f"judge_{re.sub(r'[^A-Za-z0-9.-]', '_', JUDGE_MODEL_ID)}.jsonl"
+    _write_batch_file(path, records)
+    _save_batch_state('records.json', index)
+    return path
+
+def _import_example_output(example_dir: Path, model_output: dict, pending: dict, defer_judge: bool) -> ExampleOutcome:
+    """Save a batch result for an example, then judge and publish it or leave it pending"""
+    job = ExampleJob(example_dir, started=time.monotonic())
+    prepare_result_paths(job)
+    job.prompt = get_example_registry().prompt(example_dir)
+    job.returncode = 0
+    # Nova's native response has the same output.message.content shape as Converse's
+    job.stdout = json.dumps(model_output)
+    run_stage(stage_extract, job)
+    if defer_judge and job.previous_result_path and job.outcome is None:
+        pending[InputManifest.example_id(example_dir)] = {
+            'previous': str(job.previous_result_path), 'new': str(job.new_results_path)}
+        job.finish('pending', str(job.new_results_path))
+        job.outcome.duration = time.monotonic() - job.started
+        return job.outcome
+    for stage in (stage_judge, stage_publish):
+        run_stage(stage, job)
+    return job.outcome
+
+def _resolve_pending(example_id: str, entry: dict) -> ExampleOutcome:
+    """Judge and publish a pending comparison"""
+    example_dir = Path('docs/prompts') / example_id
+    job = ExampleJob(example_dir, started=time.monotonic(), returncode=0,
+                     previous_result_path=Path(entry['previous']), new_results_path=Path(entry['new']),
+                     prompt=get_example_registry().prompt(example_dir))
+    for stage in (stage_judge, stage_publish):
+        run_stage(stage, job)
+    return job.outcome
+
+def import_batch_output(output_paths: list[Path], defer_judge: bool = False) -> list[ExampleOutcome]:
+    """
+    Ingest Bedrock batch-inference output (the .jsonl.out files) written for our exports
+    
+    Example records become results files and go through the usual judge and publish
+    stages, or are left pending with defer_judge. Judge records are stored in the
+    verdict cache. Afterwards every pending comparison that no longer needs a model
+    call is judged and published.
+    
+    Args:
+        output_paths: Batch output files, e.g. downloaded from the job's S3 output location
+        defer_judge: Leave new example results pending, for "batch export --judge"
+        
+    Returns:
+        list[ExampleOutcome]: What happened to each example
+    """
+    index = _load_batch_state('records.json')
+    pending = _load_batch_state('pending.json')
+    outcomes, imported_dirs = [], []
+    for output_path in output_paths:
+        with open(output_path) as f:
+            lines = [line for line in f if line.strip()]
+        logger_main.info(f"Importing {len(lines)} records from {output_path}")
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                logger_main.error(f"Skipping malformed record in {output_path}: {str(e)}")
+                continue
+            entry = index.get(record.get('recordId'))
+            if entry is None:
+                logger_main.info(f"Skipping unknown record {record.get('recordId')}")
+                continue
+            example_dir = Path('docs/prompts') / entry['example']
+            if 'modelOutput' not in record:
+                error = record.get('error', 'no modelOutput')
+                logger_main.error(f"Batch record for {entry['example']} failed: {error}")
+                if entry['kind'] == 'example':
+                    outcomes.append(ExampleOutcome(example_dir.name, 'error', detail=str(error)))
+                continue
+            
+            if entry['kind'] == 'example':
+                outcomes.append(_import_example_output(example_dir, record['modelOutput'], pending, defer_judge))
+                imported_dirs.append(example_dir)
+                continue
+            try:
+                judge_text = record['modelOutput']['content'][0]['text']
+            except (KeyError, IndexError, TypeError):
+                logger_main.error(f"Batch judge record for {entry['example']} has no text output: {record['modelOutput']}")
+                continue
+            response_choice, explanation = parse_judge_response(judge_text)
+            if judge_cache is not None and response_choice in ("new_response", "old_response"):
+                judge_cache.put(entry['cache_key'], response_choice, explanation)
+    
+    for example_id, entry in sorted(pending.items()):
+        pair = _read_pair(entry)
+        if pair is None:
+            del pending[example_id]
+        elif not needs_judge_call(*pair, get_example_registry().prompt(PROMPTS_DIR / example_id)):
+            del pending[example_id]
+            outcomes.append(_resolve_pending(example_id, entry))
+            imported_dirs.append(Path('docs/prompts') / example_id)
+    _save_batch_state('pending.json', pending)
+    publish_docs(imported_dirs)
+    if pending:
+        logger_main.info(f"{len(pending)} comparisons still pending; export them with \"batch export --judge\"")
+    return outcomes
+
+def batch_main(argv: list[str]) -> int:
+    """Entry point of the batch subcommand"""
+    global judge_cache
+    parser = argparse.ArgumentParser(prog='test_examples.py batch', description='Export examples and judge comparisons as Bedrock batch-inference JSONL, and import the results')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export', help='Write batch-inference input files, one per model, to results/batch/.')
+    export_parser.add_argument('example', nargs='?', help='Name of the example directory to export. If not provided, exports all examples.')
+    export_parser.add_argument('--judge', action='store_true', help='Export the judge prompts of pending comparisons instead of examples.')
+    export_parser.add_argument('--output-dir', type=Path, default=BATCH_DIR, help='Directory for the JSONL files (default: results/batch).')
+    import_parser = subparsers.add_parser('import', help='Ingest batch-inference output files and update results and example.md files.')
+    import_parser.add_argument('outputs', nargs='+', type=Path, help='Batch output files (.jsonl.out).')
+    import_parser.add_argument('--defer-judge', action='store_true', help='Leave new results pending so their comparisons can be judged in a batch too.')
+    args = parser.parse_args(argv)
+    judge_cache = VerdictCache(CACHE_DIR / 'judge_verdicts.sqlite')
+    
+    if args.command == 'export':
+        if args.judge:
+            export_judge_batch(args.output_dir)
+        else:
+            export_example_batch(select_example_dirs(args.example), args.output_dir)
+        return 0
+    
+    started = time.monotonic()
+    outcomes = import_batch_output(args.outputs, args.defer_judge)
+    log_summary(outcomes, time.monotonic() - started)
+    return 0 if all(outcome.status not in ('error', 'unjudged') for outcome in outcomes) else 1
+
+def _add_runtime_arguments(parser: argparse.ArgumentParser):
+    """Options shared by every command that executes examples"""
+    parser.add_argument('--workers', type=int, default=1, help='Number of examples to execute concurrently (default: 1). Calls still respect the shared rate limiter.')
+    parser.add_argument('--rpm', type=float, default=RPM, help=f'Starting calls per minute for each model (default: {RPM}). Adjusted automatically on success and throttling.')
+    parser.add_argument('--max-rpm', type=float, default=MAX_RPM, help=f'Upper bound for the adaptive rate of each model, and the fixed limit for all calls in a region (default: {MAX_RPM}).')
+    parser.add_argument('--replay', choices=REPLAY_MODES, default='off', help='Record/replay Bedrock responses under results/.cache/replay: "record" replays stored responses and records new ones, "replay" never calls Bedrock, "refresh" re-records everything (default: off).')
+    parser.add_argument('--executor', choices=['subprocess', 'warm', 'json'], default='subprocess', help='How to run example.py files: a fresh interpreter each time, a pool of pre-warmed interpreters that import boto3 once, or "json" to send example.json requests from this process for examples marked \"prints_response: true\" in .meta.yaml whose example.json matches what example.py sends (default: subprocess).')
+    parser.add_argument('--stream', action='store_true', help='Send the Converse request example.py makes through converse_stream, capturing time to first token and inter-token latency, for examples marked "prints_response: true" in .meta.yaml. Other examples run as usual.')
+    parser.add_argument('--endpoint-url', help='Send every Bedrock call, including those example.py makes, to this endpoint instead of AWS (e.g. http://127.0.0.1:8765 for a "fake-bedrock" server).')
+
+def _apply_runtime_arguments(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """Validate the shared options and configure the module from them"""
+    global bedrock_rate_limiter, replay_mode, stream_mode, endpoint_url
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    if not MIN_RPM <= args.rpm <= args.max_rpm:
+        parser.error(f'--rpm must be between {MIN_RPM} and --max-rpm')
+    bedrock_rate_limiter = AdaptiveRateLimiter(args.rpm, max_rpm=args.max_rpm)
+    replay_mode = args.replay
+    stream_mode = args.stream
+    if args.endpoint_url:
+        endpoint_url = args.endpoint_url
+        # Inherited by example.py subprocesses and warm workers, whose boto3 reads it
+        os.environ['AWS_ENDPOINT_URL_BEDROCK_RUNTIME'] = endpoint_url
+
+def benchmark_main(argv: list[str]) -> int:
+    """Entry point of the benchmark subcommand"""
+    parser = argparse.ArgumentParser(prog='test_examples.py benchmark', description='Benchmark latency, throughput and token usage of Nova prompt examples')
+    parser.add_argument('example', nargs='?', help='Name of the example directory to benchmark. If not provided, benchmarks all examples.')
+    parser.add_argument('--iterations', '-n', type=int, default=5, help='Runs per example (default: 5).')
+    parser.add_argument('--baseline', type=Path, default=BENCHMARK_DIR / 'baseline.json', help='Baseline summary to compare against (default: results/benchmarks/baseline.json).')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Relative slowdown flagged as a regression (default: 0.2 = 20%%).')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline.')
+    _add_runtime_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.iterations < 1:
+        parser.error('--iterations must be at least 1')
+    _apply_runtime_arguments(parser, args)
+    
+    regressions = run_benchmark(args.example, args.iterations, args.workers, args.executor,
+                                args.baseline, args.threshold, args.save_baseline)
+    return 1 if regressions else 0
+
+def history_main(argv: list[str]) -> int:
+    """Entry point of the history subcommand"""
+    parser = argparse.ArgumentParser(prog='test_examples.py history', description='Query the history of judge comparisons')
+    parser.add_argument('query', choices=('win-rate', 'judge-latency', 'timeouts'), help='"win-rate": how often the new result won, per example; "judge-latency": judge call latency per model; "timeouts": example.py run times, failures and timeout budgets, per example.')
+    parser.add_argument('--days', type=float, default=30, help='Only count comparisons (or runs) from the last DAYS days, for win-rate and timeouts (default: 30).')
+    args = parser.parse_args(argv)
+    
+    if args.query == 'timeouts':
+        executions = get_execution_history()
+        lines = [f"{'Example':<50}  {'Runs':>5}  {'Timeouts':>8}  {'Failed':>6}  {'p50 s':>6}  {'p99 s':>6}  {'Budget s':>8}"]
+        for example, runs, timeouts, failed in executions.summary(args.days):
+            durations = executions.durations(example)
+            lines.append(f"{example:<50}  {runs:>5}  {timeouts:>8}  {failed:>6}  {percentile(durations, 50) or 0:>6.1f}  "
+                         f"{percentile(durations, 99) or 0:>6.1f}  {example_timeout(PROMPTS_DIR / example):>8.0f}")
+        logger_main.info(f"example.py runs over the last {args.days:g} days:\n" + '\n'.join(lines))
+        return 0
+    history = get_comparison_history()
+    
+    if args.query == 'win-rate':
+        rows = history.win_rates(args.days)
+        lines = [f"{'Example':<50}  {'Compared':>8}  {'New won':>7}  {'Win rate':>8}"]
+        lines += [f"{example:<50}  {count:>8}  {wins:>7}  {rate:>8.0%}" for example, count, wins, rate in rows]
+        logger_main.info(f"New result win rate over the last {args.days:g} days:\n" + '\n'.join(lines))
+    else:
+        rows = history.judge_latency()
+        lines = [f"{'Judge model':<50}  {'Calls':>6}  {'Mean ms':>8}  {'Min ms':>8}  {'Max ms':>8}"]
+        lines += [f"{model:<50}  {calls:>6}  {mean:>8.0f}  {low:>8.0f}  {high:>8.0f}" for model, calls, mean, low, high in rows]
+        logger_main.info("Judge latency by model:\n" + '\n'.join(lines))
+    return 0
+
+def conform_main(argv: list[str]) -> int:
+    """Entry point of the conform subcommand"""
+    parser = argparse.ArgumentParser(prog='test_examples.py conform', description='Check offline that example.json and example.sh describe the request example.py sends')
+    parser.add_argument('example', nargs='?', help='Name, ID or glob of the examples to check. If not provided, checks all examples.')
+    parser.add_argument('--category', help='Only check examples in this category.')
+    parser.add_argument('--model', help='Only check examples whose model ID contains this.')
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    example_dirs = select_example_dirs(args.example, args.category, args.model)
+    if not example_dirs:
+        return 1
+    
+    # Captures patch boto3 process-wide and run one at a time, so there is nothing to parallelise
+    reports = [conformance_check(example_dir) for example_dir in example_dirs]
+    elapsed = time.perf_counter() - started
+    
+    def status(differences: Optional[list[str]]) -> str:
+        if differences is None:
+            return '-'
+        if not differences:
+            return 'ok'
+        return f"{len(differences)} difference" + ('s' if len(differences) > 1 else '')
+    
+    lines = [f"{'Example':<50}  {'example.json':<16}  {'example.sh':<16}"]
+    details = []
+    for report in reports:
+        if 'error' in report:
+            lines.append(f"{report['example']:<50}  {'example.py failed':<34}")
+            details.append(f"{report['example']}: example.py: {report['error']}")
+            continue
+        lines.append(f"{report['example']:<50}  {status(report['json']):<16}  {status(report['sh']):<16}")
+        details += [f"{report['example']}: example.{name}: {difference}" for name in ('json', 'sh')
+                    for difference in report[name] or []]
+    failed = sum(1 for report in reports if 'error' in report or report['json'] or report['sh'])
+    logger_main.info("Request conformance:\n" + '\n'.join(lines))
+    for detail in details:
+        logger_main.info(detail)
+    logger_main.info(f"{len(reports) - failed} of {len(reports)} examples conform ({elapsed:.2f}s)")
+    return 1 if failed else 0
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Command line entry point: run examples, or dispatch to a subcommand"""
+    global judge_cache, prejudge_method, prejudge_threshold, judge_mode
+    global tiered_judge, fast_judge_model_id, fast_judge_min_confidence
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'benchmark':
+        return benchmark_main(argv[1:])
+    if argv and argv[0] == 'batch':
+        return batch_main(argv[1:])
+    if argv and argv[0] == 'history':
+        return history_main(argv[1:])
+    if argv and argv[0] == 'conform':
+        return conform_main(argv[1:])
+    if argv and argv[0] == 'fake-bedrock':
+        import fake_bedrock
+        return fake_bedrock.main(argv[1:], prog='test_examples.py fake-bedrock')
+    
+    parser = argparse.ArgumentParser(description='Run Nova prompt examples', epilog='Subcommands: "benchmark", "batch", "history", "conform" and "fake-bedrock" (see "<subcommand> --help").')
+    parser.add_argument('example', nargs='?', help='Name of the example directory to run (e.g., "function_generator"), its category/name ID, or a glob such as "analyze_*". If not provided, runs all examples.')
+    parser.add_argument('--category', help='Only run examples in this category (e.g., "reasoning").')
+    parser.add_argument('--model', help='Only run examples whose model ID contains this (e.g., "nova-2-lite").')
+    parser.add_argument('--no-judge-cache', action='store_true', help='Always call the judge model, ignoring cached verdicts.')
+    parser.add_argument('--clear-judge-cache', action='store_true', help='Delete all cached judge verdicts before running.')
+    parser.add_argument('--prejudge', choices=PREJUDGE_METHODS, default='off', help='Similarity check run before the judge; pairs at or above --prejudge-threshold keep the old result without a judge call (default: off).')
+    parser.add_argument('--prejudge-threshold', type=float, default=PREJUDGE_THRESHOLD, help=f'Similarity needed to skip the judge (default: {PREJUDGE_THRESHOLD}).')
+    parser.add_argument('--judge-mode', choices=JUDGE_MODES, default='full', help='Send the judge both complete responses, or the trimmed prompt plus a unified diff when the diff is compact (default: full).')
+    parser.add_argument('--tiered-judge', action='store_true', help='Ask a fast model for a verdict and confidence first, and only escalate low-confidence pairs to the judge model.')
+    parser.add_argument('--fast-judge-model', default=FAST_JUDGE_MODEL_ID, help=f'Model used for the fast tier of --tiered-judge (default: {FAST_JUDGE_MODEL_ID}).')
+    parser.add_argument('--escalate-below', type=int, default=FAST_JUDGE_MIN_CONFIDENCE, help=f'Fast-tier confidence (0-100) below which a pair is escalated (default: {FAST_JUDGE_MIN_CONFIDENCE}).')
+    parser.add_argument('--judge-workers', type=int, help='Number of comparisons to run concurrently (default: same as --workers).')
+    parser.add_argument('--rebuild-results-index', action='store_true', help='Re-create the index of current results from the example.md files before running.')
+    parser.add_argument('--resume', metavar='RUN_ID', help='Finish an interrupted run, skipping the stages each example already completed.')
+    parser.add_argument('--changed', action='store_true', help='Only run examples whose example.py, example.json, side inputs or model changed since their last successful run.')
+    _add_runtime_arguments(parser)
+    args = parser.parse_args(argv)
+    _apply_runtime_arguments(parser, args)
+    if not args.no_judge_cache or args.clear_judge_cache:
+        judge_cache = VerdictCache(CACHE_DIR / 'judge_verdicts.sqlite')
+        if args.clear_judge_cache:
+            judge_cache.clear()
+            logger_main.info("Cleared judge verdict cache")
+        if args.no_judge_cache:
+            judge_cache = None
+    
+    if args.rebuild_results_index:
+        get_results_index().rebuild()
+    if args.judge_workers is not None and args.judge_workers < 1:
+        parser.error('--judge-workers must be at least 1')
+    prejudge_method, prejudge_threshold = args.prejudge, args.prejudge_threshold
+    judge_mode = args.judge_mode
+    tiered_judge, fast_judge_model_id, fast_judge_min_confidence = (
+        args.tiered_judge, args.fast_judge_model, args.escalate_below)
+    
+    run_examples(args.example, workers=args.workers, executor=args.executor, changed_only=args.changed,
+                 judge_workers=args.judge_workers, resume=args.resume, category=args.category, model=args.model)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
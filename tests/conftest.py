@@ -0,0 +1,80 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import fake_bedrock  # noqa: E402
+import test_examples as runner  # noqa: E402
+
+# Shared objects the runner builds lazily from paths relative to the working directory
+RUNNER_SINGLETONS = ('judge_cache', 'comparison_history', 'execution_history', 'run_journal',
+                     'results_index', 'example_registry', 'replay_store', 'endpoint_url')
+# Settings main() changes, restored after each test
+RUNNER_SETTINGS = ('prejudge_method', 'prejudge_threshold', 'judge_mode', 'tiered_judge',
+                   'fast_judge_model_id', 'fast_judge_min_confidence', 'replay_mode', 'stream_mode')
+
+
+@pytest.fixture
+def sandbox(tmp_path, monkeypatch):
+    """A copy of docs/ and the tracked results in tmp_path, made the working directory
+
+    The runner reads and writes docs/prompts and results/ relative to the working
+    directory, so tests run against the copy and leave the checkout untouched.
+    """
+    shutil.copytree(REPO_ROOT / 'docs', tmp_path / 'docs', ignore=shutil.ignore_patterns('__pycache__'))
+    shutil.copytree(REPO_ROOT / 'results', tmp_path / 'results', ignore=shutil.ignore_patterns('.cache', 'batch', '*.sqlite*'))
+    monkeypatch.chdir(tmp_path)
+    for name in RUNNER_SINGLETONS:
+        monkeypatch.setattr(runner, name, None)
+    for name in RUNNER_SETTINGS:
+        monkeypatch.setattr(runner, name, getattr(runner, name))
+    monkeypatch.setattr(runner, '_conformance_results', {})
+    monkeypatch.setattr(runner, '_bedrock_clients', {})
+    monkeypatch.setattr(runner, 'bedrock_rate_limiter', runner.AdaptiveRateLimiter(runner.RPM))
+    return tmp_path
+
+
+@pytest.fixture
+def fake_bedrock_server(monkeypatch):
+    """Start fake Bedrock runtimes on free ports; returns start(profile=None, **options) -> (fake, endpoint)
+
+    The AWS settings the example.py subprocesses inherit point at the latest server
+    started, and are restored after the test.
+    """
+    servers = []
+
+    def start(profile=None, **options):
+        profile = profile or fake_bedrock.FakeModelProfile(latency='fixed:0', tokens_per_second=100000)
+        fake = fake_bedrock.FakeBedrock(profile, seed=1, **options)
+        server = fake_bedrock.serve_fake_bedrock(fake, port=0)
+        servers.append(server)
+        endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+        for name, value in (('AWS_ENDPOINT_URL_BEDROCK_RUNTIME', endpoint), ('AWS_ACCESS_KEY_ID', 'fake'),
+                            ('AWS_SECRET_ACCESS_KEY', 'fake'), ('AWS_DEFAULT_REGION', 'us-west-2')):
+            monkeypatch.setenv(name, value)
+        return fake, endpoint
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def run_main(monkeypatch, argv):
+    """Run the runner's command line with argv; returns the outcome of every example run"""
+    outcomes = []
+    run_examples = runner.run_examples
+    monkeypatch.setattr(runner, 'run_examples',
+                        lambda *args, **kwargs: outcomes.extend(run_examples(*args, **kwargs)) or outcomes)
+    assert runner.main(argv) == 0
+    monkeypatch.setattr(runner, 'run_examples', run_examples)
+    return outcomes
+
+
+def failures(outcomes):
+    """(name, status, detail) of every outcome that is not a success, for assertion messages"""
+    return [(outcome.name, outcome.status, outcome.detail) for outcome in outcomes if not runner.is_successful(outcome)]
@@ -0,0 +1,52 @@
+import json
+from pathlib import Path
+
+from conftest import runner
+
+AGILITY_STORY = Path('docs/prompts/generation/agility_story')
+CREATIVE_WRITING = Path('docs/prompts/generation/creative_writing')
+
+
+def _write_output(path: Path, input_path: Path, model_output_for):
+    """Write a batch job's .jsonl.out for input_path, as Bedrock would"""
+    lines = []
+    for line in input_path.read_text().splitlines():
+        record = json.loads(line)
+        lines.append(json.dumps({**record, 'modelOutput': model_output_for(record)}))
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+
+def test_batch_round_trip(sandbox):
+    runner.judge_cache = runner.VerdictCache(runner.CACHE_DIR / 'judge_verdicts.sqlite')
+
+    # Only examples whose example.json stands in for example.py are exported
+    paths = runner.export_example_batch([AGILITY_STORY, CREATIVE_WRITING])
+    assert len(paths) == 1
+    exported = [json.loads(line) for line in paths[0].read_text().splitlines()]
+    assert len(exported) == 1
+    assert exported[0]['modelInput']['schemaVersion'] == 'messages-v1'
+
+    answer = 'A fixture user story that differs from the current result.'
+    outputs = _write_output(sandbox / 'examples.jsonl.out', paths[0], lambda record: {
+        'output': {'message': {'role': 'assistant', 'content': [{'text': answer}]}},
+        'stopReason': 'end_turn', 'usage': {'inputTokens': 10, 'outputTokens': 12, 'totalTokens': 22}})
+    outcomes = runner.import_batch_output([outputs], defer_judge=True)
+    assert [outcome.status for outcome in outcomes] == ['pending']
+
+    judge_path = runner.export_judge_batch()
+    assert judge_path is not None
+    verdict = '<explanation>The fixture is better.</explanation><response_choice>new_response</response_choice>'
+    judge_outputs = _write_output(sandbox / 'judge.jsonl.out', judge_path,
+                                  lambda record: {'content': [{'type': 'text', 'text': verdict}]})
+    # A malformed judge record is reported and skipped, not fatal to the import
+    with open(judge_outputs, 'a') as f:
+        f.write(json.dumps({'recordId': json.loads(judge_path.read_text())['recordId'],
+                            'modelOutput': {'content': []}}) + '\n')
+        f.write('not json\n')
+    outcomes = runner.import_batch_output([judge_outputs])
+    assert [outcome.status for outcome in outcomes] == ['promoted']
+
+    current = runner.get_results_index().get(AGILITY_STORY)
+    assert current.read_text() == answer
+    assert f'--8<-- "{current.as_posix()}"' in (AGILITY_STORY / 'example.md').read_text()
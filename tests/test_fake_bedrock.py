@@ -0,0 +1,48 @@
+from conftest import failures, run_main, runner
+
+FAST = ['--workers', '8', '--rpm', '1000', '--max-rpm', '10000']
+
+
+def test_suite_runs_against_fake_bedrock(sandbox, fake_bedrock_server, monkeypatch):
+    """Smoke check: every example, and the judge, against a local fake Bedrock runtime"""
+    fake, endpoint = fake_bedrock_server()
+
+    outcomes = run_main(monkeypatch, ['--endpoint-url', endpoint] + FAST)
+
+    assert len(outcomes) == len(runner.find_example_dirs(runner.PROMPTS_DIR))
+    assert not failures(outcomes)
+    # The canned replies differ from the committed results, so the judge was asked
+    assert fake.stats[('invoke', runner.JUDGE_MODEL_ID, 'served')] > 0
+
+
+def test_record_then_replay(sandbox, fake_bedrock_server, monkeypatch):
+    """Responses recorded by the warm workers land in results/.cache/replay and replay offline"""
+    fake, endpoint = fake_bedrock_server()
+    outcomes = run_main(monkeypatch, ['--endpoint-url', endpoint, '--replay', 'record'] + FAST)
+    assert not failures(outcomes)
+    # One recording per request served, by the examples in the warm workers and by the judge
+    served = sum(count for (_, _, result), count in fake.stats.items() if result == 'served')
+    assert len(list((sandbox / runner.REPLAY_DIR).rglob('*.json'))) == served
+
+    # Replaying against a server that no longer answers must not need it
+    monkeypatch.setattr(runner, '_bedrock_clients', {})
+    outcomes = run_main(monkeypatch, ['--endpoint-url', 'http://127.0.0.1:9', '--replay', 'replay'] + FAST)
+    assert len(outcomes) == len(runner.find_example_dirs(runner.PROMPTS_DIR))
+    assert not failures(outcomes)
+
+
+def test_stream_mode_streams_every_converse_example(sandbox, fake_bedrock_server, monkeypatch):
+    fake, endpoint = fake_bedrock_server()
+
+    outcomes = run_main(monkeypatch, ['--stream', '--endpoint-url', endpoint] + FAST)
+
+    assert not failures(outcomes)
+    streamed = sum(count for (operation, _, result), count in fake.stats.items()
+                   if operation == 'converse-stream' and result == 'served')
+    converse_examples = [example_dir for example_dir in runner.find_example_dirs(runner.PROMPTS_DIR)
+                         if runner.get_example_registry().get(example_dir).api == 'converse']
+    assert streamed == len(converse_examples)
+    # The streamed text went straight to the results file that is now current
+    current = runner.get_results_index().get(sandbox / 'docs/prompts/reasoning/long_context')
+    assert current.read_text().startswith('Canned response from ')
+    assert not list((sandbox / 'results').glob('.*.partial'))
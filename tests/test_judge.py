@@ -0,0 +1,160 @@
+import io
+import json
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import runner
+
+AGILITY_STORY = Path('docs/prompts/generation/agility_story')
+
+
+class FailingBedrock:
+    """A bedrock-runtime client whose every call fails, as when throttled"""
+    meta = SimpleNamespace(region_name='us-west-2')
+
+    def invoke_model(self, **kwargs):
+        raise RuntimeError("ThrottlingException: Too many requests")
+
+
+class JudgeBedrock:
+    """A bedrock-runtime client that always prefers choice, counting the judge calls made
+
+    invoke_model answers as the judge model does; converse as the fast tier, with confidence.
+    """
+    meta = SimpleNamespace(region_name='us-west-2')
+
+    def __init__(self, choice='new_response', confidence=90):
+        self.choice, self.confidence = choice, confidence
+        self.judge_prompts, self.fast_prompts = [], []
+
+    def invoke_model(self, modelId, body):
+        self.judge_prompts.append(json.loads(body)['messages'][0]['content'])
+        text = f"<thinking>Weighing both</thinking><explanation>Clearer</explanation><response_choice>{self.choice}</response_choice>"
+        return {'body': io.BytesIO(json.dumps({'content': [{'text': text}]}).encode())}
+
+    def converse(self, modelId, messages, inferenceConfig):
+        self.fast_prompts.append(messages[0]['content'][0]['text'])
+        text = f"{self.choice}</response_choice><confidence>{self.confidence}"
+        return {'output': {'message': {'content': [{'text': text}]}}}
+
+
+@pytest.fixture
+def judge_bedrock(sandbox, monkeypatch):
+    """A JudgeBedrock every judge call in the sandbox goes to, with no rate limit delays or stats carried over"""
+    bedrock = JudgeBedrock()
+    monkeypatch.setattr(runner, 'get_bedrock_client', lambda *args: bedrock)
+    monkeypatch.setattr(runner, 'bedrock_rate_limiter', runner.AdaptiveRateLimiter(6000, max_rpm=6000))
+    monkeypatch.setattr(runner, 'judge_stats', Counter())
+    return bedrock
+
+
+def test_judge_failure_is_not_a_verdict(sandbox, monkeypatch):
+    monkeypatch.setattr(runner, 'get_bedrock_client', FailingBedrock)
+    monkeypatch.setattr(runner, 'prejudge_method', 'off')
+    previous = runner.get_results_index().get(AGILITY_STORY)
+    new = sandbox / 'results' / 'agility_story_new.md'
+    new.write_text('A different answer')
+    job = runner.ExampleJob(AGILITY_STORY, returncode=0, previous_result_path=previous,
+                            new_results_path=new, prompt='Write a user story')
+
+    runner.stage_judge(job)
+    assert job.response_choice == runner.JUDGE_ERROR
+    runner.stage_publish(job)
+
+    assert job.outcome.status == 'unjudged'
+    assert not runner.is_successful(job.outcome)
+    assert not new.exists()
+    assert runner.get_results_index().get(AGILITY_STORY) == previous
+
+
+def test_judge_failures_stay_out_of_history(sandbox, monkeypatch):
+    monkeypatch.setattr(runner, 'get_bedrock_client', FailingBedrock)
+    monkeypatch.setattr(runner, 'prejudge_method', 'off')
+    old, new = sandbox / 'old.md', sandbox / 'new.md'
+    old.write_text('One answer')
+    new.write_text('Another answer')
+
+    response_choice, _ = runner.compare_results('A prompt', old, new, 'generation/agility_story')
+    assert response_choice == runner.JUDGE_ERROR
+
+    history = runner.get_comparison_history()
+    assert history.win_rates() == []
+    # Rows written before judge failures had their own verdict do not count either
+    history.add('generation/agility_story', 'One answer', 'Another answer', 'old_response',
+                'Error occurred during model evaluation: ThrottlingException')
+    history.add('generation/agility_story', 'One answer', 'Another answer', 'new_response', 'Better')
+    assert history.win_rates() == [('generation/agility_story', 1, 1, 1.0)]
+
+
+def test_verdict_cache_hit_miss_and_clear(judge_bedrock, monkeypatch):
+    monkeypatch.setattr(runner, 'judge_cache', runner.VerdictCache(runner.CACHE_DIR / 'judge_verdicts.sqlite'))
+
+    first = runner.judge_with_model('One answer', 'Another answer', 'A prompt')
+    assert runner.judge_with_model('One answer', 'Another answer', 'A prompt') == first == ('new_response', 'Clearer')
+    runner.judge_with_model('One answer', 'A third answer', 'A prompt')
+    assert len(judge_bedrock.judge_prompts) == 2
+    assert runner.judge_stats == Counter(judged=2, cached=1)
+
+    monkeypatch.setattr(runner, 'run_examples', lambda *args, **kwargs: [])
+    assert runner.main(['--clear-judge-cache']) == 0
+    assert runner.judge_cache.get(runner.judge_cache_key('One answer', 'Another answer', 'A prompt')) is None
+    runner.judge_with_model('One answer', 'Another answer', 'A prompt')
+    assert len(judge_bedrock.judge_prompts) == 3
+
+
+def test_prejudge_keeps_old_result_at_or_above_threshold(judge_bedrock, monkeypatch):
+    old, new = Path('old.md'), Path('new.md')
+    old.write_text('1. Gather requirements\n2. Write the user story\n3. Review it with the team')
+    new.write_text('- Gather requirements\n-   Write the user story\n- Review it with the whole team\n')
+    similarity = runner.output_similarity(old.read_text(), new.read_text(), 'ratio')
+    assert 0.8 < similarity < 1
+    monkeypatch.setattr(runner, 'prejudge_method', 'ratio')
+
+    monkeypatch.setattr(runner, 'prejudge_threshold', similarity)
+    assert runner.compare_results('A prompt', old, new)[0] == 'old_response'
+    assert judge_bedrock.judge_prompts == []
+
+    monkeypatch.setattr(runner, 'prejudge_threshold', similarity + 0.01)
+    assert runner.compare_results('A prompt', old, new)[0] == 'new_response'
+    assert len(judge_bedrock.judge_prompts) == 1
+    assert runner.judge_stats == Counter(similar=1, judged=1)
+
+
+def test_diff_mode_sends_a_compact_diff_and_falls_back_to_full_text(judge_bedrock, monkeypatch):
+    monkeypatch.setattr(runner, 'judge_mode', 'diff')
+    paragraphs = [f"Paragraph {number} of a long and stable answer." for number in range(40)]
+    old = '\n'.join(paragraphs)
+    new = '\n'.join(paragraphs[:20] + ['Paragraph 20, now rewritten.'] + paragraphs[21:])
+
+    assert runner.judge_with_model(old, new, 'A prompt') == ('new_response', 'Clearer')
+    diff_prompt = judge_bedrock.judge_prompts[-1]
+    assert '<diff>' in diff_prompt and '<old_response>' not in diff_prompt
+    assert '+Paragraph 20, now rewritten.' in diff_prompt and '-Paragraph 20 of' in diff_prompt
+    assert 'Paragraph 0 of' not in diff_prompt
+    assert len(diff_prompt) < len(old)
+
+    # Responses with nothing in common are judged in full
+    runner.judge_with_model(old, 'A completely different answer', 'A prompt')
+    full_prompt = judge_bedrock.judge_prompts[-1]
+    assert '<diff>' not in full_prompt and f"<old_response>\n        {old}" in full_prompt
+
+
+@pytest.mark.parametrize('confidence, escalated', [(95, False), (40, True)])
+def test_tiered_judge_escalates_only_unsure_fast_verdicts(judge_bedrock, monkeypatch, confidence, escalated):
+    monkeypatch.setattr(runner, 'tiered_judge', True)
+    judge_bedrock.confidence = confidence
+
+    response_choice, explanation = runner.judge_pair('One answer', 'Another answer', 'A prompt')
+
+    assert response_choice == 'new_response'
+    assert len(judge_bedrock.fast_prompts) == 1
+    assert len(judge_bedrock.judge_prompts) == (1 if escalated else 0)
+    if escalated:
+        assert explanation == 'Clearer'
+        assert runner.judge_stats == Counter(escalated=1, judged=1)
+    else:
+        assert explanation == f"Decided by {runner.FAST_JUDGE_MODEL_ID} with confidence 95"
+        assert runner.judge_stats == Counter(fast=1)
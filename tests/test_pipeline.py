@@ -0,0 +1,41 @@
+import logging
+import time
+
+import pytest
+
+import fake_bedrock
+from conftest import failures, run_main, runner
+
+
+class InterruptAfterFirstExample(logging.Handler):
+    """Raise KeyboardInterrupt in the main thread, as Ctrl-C would, when the first example's logs are replayed"""
+    def emit(self, record):
+        if record.getMessage().startswith('Deleted new results file') or 'Results saved to' in record.getMessage():
+            raise KeyboardInterrupt
+
+
+def test_interrupt_stops_promptly_and_resumes(sandbox, fake_bedrock_server, monkeypatch):
+    # Slow enough replies that the whole suite would take far longer than the interrupted run
+    fake, endpoint = fake_bedrock_server(fake_bedrock.FakeModelProfile(latency='fixed:1000', tokens_per_second=100000))
+    handler = InterruptAfterFirstExample()
+    logging.getLogger().addHandler(handler)
+    started = time.monotonic()
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            runner.main(['--endpoint-url', endpoint, '--workers', '2', '--rpm', '1000', '--max-rpm', '10000'])
+    finally:
+        logging.getLogger().removeHandler(handler)
+    elapsed = time.monotonic() - started
+    example_dirs = runner.find_example_dirs(runner.PROMPTS_DIR)
+
+    served = sum(count for (_, model_id, result), count in fake.stats.items()
+                 if result == 'served' and model_id != runner.JUDGE_MODEL_ID)
+    assert served <= 6, "the queued examples were executed after the interrupt"
+    assert elapsed < 20
+
+    journals = list((sandbox / runner.RUNS_DIR).glob('*.jsonl'))
+    assert len(journals) == 1
+    outcomes = run_main(monkeypatch, ['--resume', journals[0].stem, '--endpoint-url', endpoint,
+                                      '--workers', '8', '--rpm', '1000', '--max-rpm', '10000'])
+    assert len(outcomes) == len(example_dirs)
+    assert not failures(outcomes)
@@ -0,0 +1,58 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fake_bedrock
+from conftest import run_main, runner
+
+
+def test_concurrent_callers_reserve_spaced_slots_without_sleeping_under_the_lock():
+    limiter = runner.RateLimiter(600)
+    started = time.monotonic()
+    with ThreadPoolExecutor(10) as executor:
+        delays = sorted(executor.map(lambda _: limiter.reserve('us.amazon.nova-lite-v1:0'), range(10)))
+    assert time.monotonic() - started < 1
+    # One call every 0.1s, each caller on its own slot
+    assert [round(delay * 10) for delay in delays] == list(range(10))
+
+    waiter = threading.Thread(target=limiter.wait, args=('us.amazon.nova-lite-v1:0',))
+    waiter.start()
+    time.sleep(0.1)
+    # The waiter sleeps for its slot a second out without holding the lock
+    assert waiter.is_alive()
+    assert limiter.lock.acquire(timeout=0.5)
+    limiter.lock.release()
+    assert limiter.reserve('us.anthropic.claude-3-haiku-20240307-v1:0') == 0
+    waiter.join()
+
+
+def test_throttling_one_model_leaves_the_region_alone():
+    limiter = runner.AdaptiveRateLimiter(30, max_rpm=60)
+    for _ in range(3):
+        limiter.reserve(runner.JUDGE_MODEL_ID, 'region:us-west-2')
+        limiter.record_throttle(runner.JUDGE_MODEL_ID, 'region:us-west-2')
+
+    rates = limiter.rates()
+    assert rates[runner.JUDGE_MODEL_ID] == 3.75
+    assert rates['region:us-west-2'] == 60
+    # Judge calls queued at the throttled rate book region slots minutes ahead...
+    assert limiter.reserve(runner.JUDGE_MODEL_ID, 'region:us-west-2') > 30
+    # ...but another model in the region still gets its calls at its own rate
+    delays = [limiter.reserve('us.amazon.nova-pro-v1:0', 'region:us-west-2') for _ in range(5)]
+    assert max(delays) < 10
+
+
+def test_throttled_judge_model_against_fake_bedrock(sandbox, fake_bedrock_server, monkeypatch):
+    throttled = fake_bedrock.FakeModelProfile(latency='fixed:0', tokens_per_second=100000, throttle_rate=1.0)
+    fake, endpoint = fake_bedrock_server(models={runner.JUDGE_MODEL_ID: throttled})
+
+    outcomes = run_main(monkeypatch, ['software_engineering/function_generator', '--endpoint-url', endpoint,
+                                      '--rpm', '600', '--max-rpm', '1200'])
+
+    assert outcomes and {outcome.status for outcome in outcomes} == {'unjudged'}
+    assert fake.stats[('invoke', runner.JUDGE_MODEL_ID, 'throttled')] >= len(outcomes)
+    rates = runner.bedrock_rate_limiter.rates()
+    assert rates[runner.JUDGE_MODEL_ID] < 600
+    assert all(rate == 1200 for key, rate in rates.items() if key.startswith('region:'))
+    example_models = [key for key in rates if key != runner.JUDGE_MODEL_ID and not key.startswith('region:')]
+    assert example_models and all(rates[key] > 600 for key in example_models)
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+import urllib3.util.connection
+
+from conftest import runner
+
+MODEL_ID = 'us.amazon.nova-lite-v1:0'
+MESSAGES = [{'role': 'user', 'content': [{'text': 'Write a haiku about caches'}]}]
+
+
+def _block_network(monkeypatch):
+    def refuse(*args, **kwargs):
+        raise OSError("network blocked by test")
+    monkeypatch.setattr(urllib3.util.connection, 'create_connection', refuse)
+
+
+def _calls(client):
+    converse = client.converse(modelId=MODEL_ID, messages=MESSAGES)
+    invoke = client.invoke_model(modelId=MODEL_ID, body=json.dumps({'messages': MESSAGES}))
+    return converse['output'], json.loads(invoke['body'].read())
+
+
+def test_record_then_replay_offline(sandbox, fake_bedrock_server, monkeypatch):
+    fake, endpoint = fake_bedrock_server()
+    monkeypatch.setattr(runner, 'endpoint_url', endpoint)
+    monkeypatch.setattr(runner, 'replay_mode', 'record')
+    recorded = _calls(runner.get_bedrock_client('us-west-2'))
+    assert fake.stats[('converse', MODEL_ID, 'served')] == 1
+
+    # A new client in another working directory, with no way to reach any endpoint
+    (sandbox / 'elsewhere').mkdir()
+    monkeypatch.chdir(sandbox / 'elsewhere')
+    monkeypatch.setattr(runner, '_bedrock_clients', {})
+    monkeypatch.setattr(runner, 'replay_mode', 'replay')
+    _block_network(monkeypatch)
+    client = runner.get_bedrock_client('us-west-2')
+
+    assert _calls(client) == recorded
+    assert runner.get_replay_store().root == (sandbox / runner.REPLAY_DIR).resolve()
+    with pytest.raises(runner.ReplayMissError):
+        client.converse(modelId=MODEL_ID, messages=[{'role': 'user', 'content': [{'text': 'Never recorded'}]}])
@@ -0,0 +1,41 @@
+from pathlib import Path
+
+from conftest import runner
+
+
+def test_result_blobs_are_copied_not_linked(sandbox):
+    results = sandbox / 'results'
+    store = runner.ResultBlobStore(sandbox / 'blobs')
+    first, second = results / 'story_1.md', results / 'story_2.md'
+    digest = store.store('The same answer', first)
+    assert store.store('The same answer', second) == digest
+
+    # An in-place edit, as an editor or a git checkout might make, changes only that file
+    with open(first, 'a') as results_file:
+        results_file.write(' and more')
+    assert store.path(digest).read_text() == 'The same answer'
+    assert second.read_text() == 'The same answer'
+
+    assert store.prune(results) == 0
+    second.unlink()
+    assert store.prune(results) == 1
+    assert not store.path(digest).exists()
+
+
+def test_results_index_never_takes_another_example_with_the_same_prefix(sandbox):
+    index = runner.get_results_index()
+    function_generator = Path('docs/prompts/software_engineering/function_generator')
+    tool_calling = Path('docs/prompts/reasoning/tool_calling')
+    # The result example.md includes wins over the bare-named function_generator_*.md
+    assert index.get(function_generator) == Path('results/software_engineering_function_generator_20250325_140700.md')
+    assert index.get(tool_calling) == Path('results/tool_calling_20251122_144515.md')
+
+    # Without an include, the newest result with exactly the example's name is used
+    example_md = sandbox / tool_calling / 'example.md'
+    example_md.write_text(example_md.read_text().replace('--8<-- "results/', '--8<-- "elsewhere/'))
+    (sandbox / 'results/tool_calling_grounding_20991231_000000.md').write_text('Another example')
+    index.rebuild()
+    assert index.get(tool_calling) == Path('results/tool_calling_20251122_144515.md')
+
+    (sandbox / 'results/tool_calling_20251122_144515.md').unlink()
+    assert index.get(tool_calling) is None
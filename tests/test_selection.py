@@ -0,0 +1,63 @@
+import shutil
+
+import pytest
+
+from conftest import runner
+
+
+def _record_runs(monkeypatch):
+    """Make examples "run" instantly and successfully; returns the IDs of those run"""
+    ran = []
+
+    def run_single_example(example_dir):
+        ran.append(runner.InputManifest.example_id(example_dir))
+        return runner.ExampleOutcome(example_dir.name, 'kept_old', returncode=0)
+
+    monkeypatch.setattr(runner, 'run_single_example', run_single_example)
+    monkeypatch.setattr(runner, 'publish_docs', lambda example_dirs: None)
+    return ran
+
+
+def test_changed_runs_only_examples_with_new_inputs(sandbox, monkeypatch):
+    ran = _record_runs(monkeypatch)
+    manifest = runner.InputManifest(runner.CACHE_DIR / 'input_manifest.json')
+    for record in runner.get_example_registry().select(category='generation'):
+        manifest.mark_successful(record.example_dir)
+
+    assert runner.run_examples(category='generation', changed_only=True) == []
+    assert ran == []
+
+    example_json = sandbox / 'docs/prompts/generation/agility_story/example.json'
+    example_json.write_text(example_json.read_text() + '\n')
+    runner.run_examples(category='generation', changed_only=True)
+    assert ran == ['generation/agility_story']
+
+    # The successful run is remembered, so nothing is left to rerun
+    runner.run_examples(category='generation', changed_only=True)
+    assert ran == ['generation/agility_story']
+
+
+def test_registry_lookup_by_name_id_glob_category_and_model(sandbox):
+    registry = runner.get_example_registry()
+
+    def ids(records):
+        return [record.example_id for record in records]
+
+    assert ids(registry.lookup('agility_story')) == ['generation/agility_story']
+    assert ids(registry.lookup('reasoning/tool_calling')) == ['reasoning/tool_calling']
+    assert ids(registry.lookup('tool_calling*')) == ['reasoning/tool_calling', 'reasoning/tool_calling_grounding']
+    assert ids(registry.select('*_architecture*', category='software_engineering')) == [
+        'software_engineering/microservices_architecture']
+    assert ids(registry.select(category='generation', model='nova-canvas')) == [
+        'generation/illustration', 'generation/image_manipulation']
+    assert len(registry.select(model='nova-2-lite')) == 9
+    assert registry.lookup('no_such_example') == []
+
+    # A new example is picked up from the changed directory mtimes, not the stale snapshot
+    shutil.copytree(sandbox / 'docs/prompts/software_engineering/function_generator',
+                    sandbox / 'docs/prompts/reasoning/function_generator')
+    runner.example_registry = None
+    registry = runner.get_example_registry()
+    assert ids(registry.lookup('reasoning/function_generator')) == ['reasoning/function_generator']
+    with pytest.raises(LookupError, match='ambiguous'):
+        registry.lookup('function_generator')
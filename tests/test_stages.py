@@ -0,0 +1,98 @@
+import subprocess
+from pathlib import Path
+
+from conftest import runner
+
+AGILITY_STORY = Path('docs/prompts/generation/agility_story')
+LONG_CONTEXT = Path('docs/prompts/reasoning/long_context')
+
+
+def test_stage_error_leaves_no_results_file(sandbox):
+    before = set((sandbox / 'results').glob('*.md'))
+    new = sandbox / 'results' / 'agility_story_partial.md'
+    new.write_text('Half a streamed resp')
+    job = runner.ExampleJob(AGILITY_STORY, returncode=0, new_results_path=new)
+
+    def broken_stage(job):
+        raise ConnectionError("Connection reset by peer")
+
+    runner.run_stage(broken_stage, job)
+
+    assert job.outcome.status == 'error'
+    assert job.outcome.detail == "Connection reset by peer"
+    assert set((sandbox / 'results').glob('*.md')) == before
+
+
+def test_client_pool_covers_execute_and_judge_workers(sandbox, monkeypatch):
+    monkeypatch.setattr(runner, 'client_pool_size', 10)
+    with runner.example_executor('subprocess', 8, 6):
+        assert runner.client_pool_size == 14
+
+
+def test_publish_docs_rewrites_only_pages_whose_result_changed(sandbox):
+    creative_writing = Path('docs/prompts/generation/creative_writing')
+    untouched = (sandbox / creative_writing / 'example.md').stat().st_mtime_ns
+    new = Path('results/agility_story_20990101_000000.md')
+    new.write_text('A newer user story')
+    runner.get_results_index().set(AGILITY_STORY, new)
+
+    changed = runner.publish_docs([AGILITY_STORY, creative_writing])
+
+    assert changed == [AGILITY_STORY / 'example.md']
+    page = (AGILITY_STORY / 'example.md').read_text()
+    assert '--8<-- "results/agility_story_20990101_000000.md"' in page
+    assert 'agility_story_20250325_140729' not in page
+    assert not Path('results/agility_story_20250325_140729.md').exists()
+    assert (sandbox / creative_writing / 'example.md').stat().st_mtime_ns == untouched
+    assert runner.CHANGED_PAGES_PATH.read_text() == 'prompts/generation/agility_story/example.md\n'
+    # A second pass has nothing left to publish
+    assert runner.publish_docs([AGILITY_STORY, creative_writing]) == []
+
+
+def _scripted_runs(monkeypatch, *runs):
+    """Make execute_example play back runs (stderr of a failed run, None for success,
+    or an exception); returns the timeouts each run was given"""
+    timeouts, runs = [], list(runs)
+
+    def execute_example(example_path, timeout):
+        timeouts.append(timeout)
+        run = runs.pop(0)
+        if isinstance(run, Exception):
+            raise run
+        return subprocess.CompletedProcess([], 1 if run else 0, stdout='{}', stderr=run or '')
+
+    monkeypatch.setattr(runner, 'execute_example', execute_example)
+    monkeypatch.setattr(runner, 'RETRY_BASE_DELAY', 0.01)
+    monkeypatch.setattr(runner, 'bedrock_rate_limiter', runner.AdaptiveRateLimiter(6000, max_rpm=6000))
+    return timeouts
+
+
+def test_transient_failures_and_timeouts_are_retried_with_a_growing_budget(sandbox, monkeypatch):
+    timeouts = _scripted_runs(monkeypatch, subprocess.TimeoutExpired('example.py', 30),
+                              'botocore.errorfactory.ThrottlingException: Too many requests', None)
+    keys = ('us.amazon.nova-pro-v1:0', 'region:us-west-2')
+
+    result = runner.execute_with_retries(AGILITY_STORY, AGILITY_STORY / 'example.py', keys)
+
+    assert result.returncode == 0
+    assert timeouts == [runner.EXAMPLE_TIMEOUT, 2 * runner.EXAMPLE_TIMEOUT, 2 * runner.EXAMPLE_TIMEOUT]
+    assert runner.get_execution_history().summary() == [('generation/agility_story', 3, 1, 1)]
+    assert runner.bedrock_rate_limiter.rates()['us.amazon.nova-pro-v1:0'] < 6000
+
+
+def test_other_failures_are_not_retried(sandbox, monkeypatch):
+    timeouts = _scripted_runs(monkeypatch, 'KeyError: \'output\'', None)
+
+    result = runner.execute_with_retries(AGILITY_STORY, AGILITY_STORY / 'example.py', ())
+
+    assert result.returncode == 1 and len(timeouts) == 1
+
+
+def test_meta_yaml_timeout_overrides_the_learned_budget(sandbox):
+    history = runner.get_execution_history()
+    for example_dir in (AGILITY_STORY, LONG_CONTEXT):
+        assert runner.example_timeout(example_dir) == (300 if example_dir == LONG_CONTEXT else runner.EXAMPLE_TIMEOUT)
+        history.add(runner.InputManifest.example_id(example_dir), 'ok', 40, 30)
+
+    assert runner.example_timeout(AGILITY_STORY) == 40 * runner.EXAMPLE_TIMEOUT_MARGIN
+    assert runner.example_timeout(LONG_CONTEXT) == 300